@@ -4,6 +4,13 @@
 Usage:
     python build.py                    # standard build (~15-30 MB)
     python build.py --bundle-model     # fat build with bundled model (~2+ GB)
+    python build.py --clean            # wipe dist/ only (keeps the analysis cache)
+    python build.py --full-clean       # wipe dist/, build/ and *.spec
+    python build.py --compress         # post-compress the binary with UPX (if installed)
+    python build.py --regenerate-spec  # rewrite termai.spec before building
+
+The PyInstaller configuration lives in termai.spec, generated on first
+build and reused afterwards.
 
 The output binary lands in dist/termai (or dist/termai.exe on Windows).
 Each OS must be built on its native platform — no cross-compilation.
@@ -12,6 +19,7 @@ Each OS must be built on its native platform — no cross-compilation.
 from __future__ import annotations
 
 import argparse
+import importlib.util
 import platform
 import shutil
 import subprocess
@@ -22,10 +30,72 @@ ROOT = Path(__file__).parent
 DIST = ROOT / "dist"
 BUILD = ROOT / "build"
 ENTRY = ROOT / "termai" / "cli.py"
+SPEC = ROOT / "termai.spec"
 
 BUNDLE_MODEL = "orca-mini-3b-gguf2-q4_0.gguf"
 MODEL_DIR = Path.home() / ".cache" / "gpt4all"
 
+_EXCLUDES = [
+    "gpt4all.tests", "tkinter", "test", "unittest",
+    "xmlrpc", "pydoc", "doctest", "lib2to3",
+]
+
+# Only the gpt4all modules termai actually imports; its native backends are
+# collected as binaries rather than pulling the whole package tree.
+_HIDDEN_IMPORTS = ["gpt4all.gpt4all", "gpt4all._pyllmodel"]
+
+# Remote AI SDKs and their dependencies, bundled when installed.
+_OPTIONAL_HIDDEN_IMPORTS = (
+    "openai", "anthropic", "httpx", "httpcore", "anyio",
+    "pydantic", "pydantic_core", "jiter", "sniffio", "h11",
+    "distro", "docstring_parser", "annotated_types",
+    "typing_inspection", "typing_extensions", "orjson",
+)
+
+# Bump when _SPEC_TEMPLATE changes so existing termai.spec files are regenerated.
+_SPEC_VERSION = 2
+
+_SPEC_TEMPLATE = """\
+# -*- mode: python ; coding: utf-8 -*-
+# Generated by build.py — run `python build.py --regenerate-spec` after changing build options.
+# options: {options}
+import sys
+
+from PyInstaller.utils.hooks import collect_data_files, collect_dynamic_libs
+
+binaries = collect_dynamic_libs("gpt4all")
+datas = {datas!r}
+if sys.platform == "darwin":
+    # The Metal backend loads its shader sources from the package directory.
+    datas += collect_data_files("gpt4all")
+
+a = Analysis(
+    [{entry!r}],
+    binaries=binaries,
+    datas=datas,
+    hiddenimports={hidden!r},
+    excludes={excludes!r},
+    # Bytecode only, compiled at -OO: PyInstaller never ships .py sources in
+    # the PYZ, and this additionally strips docstrings and asserts.
+    optimize=2,
+)
+# Drop package trees the runtime never touches.
+a.datas = [d for d in a.datas if not d[0].startswith(("gpt4all/tests/", "gpt4all/examples/"))]
+
+pyz = PYZ(a.pure)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    a.binaries,
+    a.datas,
+    [],
+    name="termai",
+    strip=True,
+    console=True,
+)
+"""
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Build termai standalone executable")
@@ -37,60 +107,42 @@ def main() -> None:
     parser.add_argument(
         "--clean",
         action="store_true",
-        help="Remove build and dist directories before building",
+        help="Remove the dist directory before building (keeps build/ for incremental reuse)",
+    )
+    parser.add_argument(
+        "--full-clean",
+        action="store_true",
+        help="Remove dist, build and generated spec files for a from-scratch build",
+    )
+    parser.add_argument(
+        "--regenerate-spec",
+        action="store_true",
+        help="Rewrite termai.spec from the current build options before building",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="Compress the finished executable with UPX (skipped if upx is unavailable)",
     )
     args = parser.parse_args()
 
     _check_pyinstaller()
 
-    if args.clean:
-        print("[build] Cleaning previous build artifacts...")
+    if args.full_clean:
+        print("[build] Removing all previous build artifacts...")
         shutil.rmtree(DIST, ignore_errors=True)
         shutil.rmtree(BUILD, ignore_errors=True)
         for spec in ROOT.glob("*.spec"):
             spec.unlink()
+    elif args.clean:
+        # build/ holds PyInstaller's analysis cache; keeping it makes rebuilds incremental.
+        print("[build] Cleaning previous dist output...")
+        shutil.rmtree(DIST, ignore_errors=True)
 
     exe_name = "termai.exe" if platform.system() == "Windows" else "termai"
 
-    cmd = [
-        sys.executable, "-m", "PyInstaller",
-        "--onefile",
-        "--name", exe_name.removesuffix(".exe"),
-        "--strip",
-        "--collect-all", "gpt4all",
-        "--exclude-module", "tkinter",
-        "--exclude-module", "test",
-        "--exclude-module", "unittest",
-        "--exclude-module", "xmlrpc",
-        "--exclude-module", "pydoc",
-        "--exclude-module", "doctest",
-        "--exclude-module", "lib2to3",
-        "--noconfirm",
-    ]
-
-    for pkg in ("openai", "anthropic", "httpx", "httpcore", "anyio",
-                "pydantic", "pydantic_core", "jiter", "sniffio", "h11",
-                "distro", "docstring_parser", "annotated_types",
-                "typing_inspection", "typing_extensions"):
-        try:
-            __import__(pkg)
-            cmd.extend(["--hidden-import", pkg])
-        except ImportError:
-            pass
-
-    if args.bundle_model:
-        model_path = MODEL_DIR / BUNDLE_MODEL
-        if not model_path.exists():
-            print(f"[build] Model not found at {model_path}")
-            print(f"[build] Download it first:  termai --setup")
-            sys.exit(1)
-
-        cmd.extend([
-            "--add-data", f"{model_path}{_sep()}bundled_model",
-        ])
-        print(f"[build] Bundling model: {BUNDLE_MODEL} ({model_path.stat().st_size / 1e9:.1f} GB)")
-
-    cmd.append(str(ENTRY))
+    _ensure_spec(bundle_model=args.bundle_model, regenerate=args.regenerate_spec)
+    cmd = [sys.executable, "-m", "PyInstaller", str(SPEC), "--noconfirm"]
 
     print(f"[build] Building {exe_name} for {platform.system()} ({platform.machine()})...")
     print(f"[build] Command: {' '.join(cmd)}\n")
@@ -102,6 +154,8 @@ def main() -> None:
 
     output = DIST / exe_name
     if output.exists():
+        if args.compress:
+            _compress(output)
         size_mb = output.stat().st_size / 1e6
         print(f"\n[build] Success! Executable: {output}")
         print(f"[build] Size: {size_mb:.1f} MB")
@@ -115,12 +169,66 @@ def _check_pyinstaller() -> None:
         import PyInstaller  # noqa: F401
     except ImportError:
         print("[build] PyInstaller not found. Installing...")
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"])
+        subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller>=6.6"])
+
+
+def _ensure_spec(*, bundle_model: bool, regenerate: bool) -> None:
+    """Write termai.spec unless a spec for the same options already exists.
+
+    The options line covers everything baked into the spec — the detected
+    optional SDKs and the absolute entry/model paths included — so
+    installing an SDK or moving the checkout regenerates it.
+    """
+    # find_spec only consults the import finders, so probing doesn't execute
+    # (and pay for) pydantic, httpx, etc. in the build driver.  Cheap enough
+    # to run on every build.
+    hidden = list(_HIDDEN_IMPORTS)
+    hidden.extend(
+        pkg for pkg in _OPTIONAL_HIDDEN_IMPORTS if importlib.util.find_spec(pkg) is not None
+    )
+    model_path = MODEL_DIR / BUNDLE_MODEL
 
+    options = (
+        f"version={_SPEC_VERSION} bundle_model={int(bundle_model)} entry={ENTRY}"
+        f" hidden={','.join(hidden)}"
+    )
+    if bundle_model:
+        options += f" model={model_path}"
+    if SPEC.exists() and not regenerate:
+        if f"# options: {options}\n" in SPEC.read_text():
+            print(f"[build] Reusing {SPEC.name}")
+            return
+        print(f"[build] {SPEC.name} was generated for different options — regenerating")
+
+    datas: list[tuple[str, str]] = []
+    if bundle_model:
+        if not model_path.exists():
+            print(f"[build] Model not found at {model_path}")
+            print(f"[build] Download it first:  termai --setup")
+            sys.exit(1)
+        datas.append((str(model_path), "bundled_model"))
+        print(f"[build] Bundling model: {BUNDLE_MODEL} ({model_path.stat().st_size / 1e9:.1f} GB)")
 
-def _sep() -> str:
-    """Return the PyInstaller --add-data separator for the current OS."""
-    return ";" if platform.system() == "Windows" else ":"
+    SPEC.write_text(_SPEC_TEMPLATE.format(
+        options=options, entry=str(ENTRY), datas=datas, hidden=hidden, excludes=_EXCLUDES,
+    ))
+    print(f"[build] Wrote {SPEC.name}")
+
+
+def _compress(output: Path) -> None:
+    """Post-compress the executable with UPX, skipping unsupported platforms."""
+    if platform.system() == "Darwin" and platform.machine() == "arm64":
+        print("[build] Skipping UPX: not supported for macOS arm64 binaries")
+        return
+    upx = shutil.which("upx")
+    if not upx:
+        print("[build] Skipping UPX: 'upx' not found on PATH")
+        return
+    before_mb = output.stat().st_size / 1e6
+    print(f"[build] Compressing with UPX ({before_mb:.1f} MB)...")
+    result = subprocess.run([upx, "--best", "--lzma", str(output)])
+    if result.returncode != 0:
+        print(f"[build] UPX failed (exit code {result.returncode}) — keeping uncompressed binary")
 
 
 if __name__ == "__main__":
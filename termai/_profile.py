@@ -0,0 +1,92 @@
+"""Opt-in profiling hooks, enabled with ``TERMAI_PROFILE=1``.
+
+Records wall time, CPU time, and peak RSS around named phases (CLI
+startup, allow-list loading, command checks) and prints one JSON summary
+to stderr at exit.  Comparing ``cpu_ms`` to ``wall_ms`` shows whether a
+phase is compute-bound or waiting on I/O.
+
+When the variable is unset, ``span()`` returns a shared no-op context and
+``profiled()`` returns the function unchanged, so there is no overhead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import sys
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from typing import Callable, Iterator, TypeVar
+
+F = TypeVar("F", bound=Callable)
+
+ENABLED = os.environ.get("TERMAI_PROFILE", "") not in ("", "0")
+
+_NOOP = nullcontext()
+_spans: list[dict] = []
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """Context manager that records one profiling span named *name*."""
+    if not ENABLED:
+        return _NOOP
+    return _record(name)
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Decorator form of ``span``; a no-op unless profiling is enabled."""
+    def decorator(fn: F) -> F:
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with _record(name):
+                return fn(*args, **kwargs)
+        return wrapper  # type: ignore[return-value]
+    return decorator
+
+
+@contextmanager
+def _record(name: str) -> Iterator[None]:
+    rss_before = _peak_rss_kb()
+    wall0 = time.perf_counter_ns()
+    cpu0 = time.process_time_ns()
+    try:
+        yield
+    finally:
+        wall_ms = (time.perf_counter_ns() - wall0) / 1e6
+        cpu_ms = (time.process_time_ns() - cpu0) / 1e6
+        rss_after = _peak_rss_kb()
+        _spans.append({
+            "name": name,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "bound": "compute" if wall_ms and cpu_ms / wall_ms >= 0.5 else "io",
+            "peak_rss_kb": rss_after,
+            "peak_rss_growth_kb": (
+                rss_after - rss_before if rss_after is not None and rss_before is not None
+                else None
+            ),
+        })
+
+
+def _peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes.
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def _dump() -> None:
+    if _spans:
+        print(json.dumps({"termai_profile": _spans}, indent=2), file=sys.stderr)
+
+
+if ENABLED:
+    atexit.register(_dump)
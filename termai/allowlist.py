@@ -15,12 +15,22 @@ If it returns True the command runs immediately.
 
 from __future__ import annotations
 
+import bisect
 import json
+import os
+import re
 import shlex
+from functools import lru_cache
 from pathlib import Path
 
+from termai._profile import profiled
 from termai.config import CONFIG_DIR
 
+try:
+    import orjson  # optional: faster (de)serialization of the allow-list files
+except ImportError:
+    orjson = None
+
 ALLOWED_FILE = CONFIG_DIR / "allowed.json"
 DISABLED_BUILTINS_FILE = CONFIG_DIR / "disabled_builtins.json"
 
@@ -64,6 +74,15 @@ _DEFAULT_SAFE_PREFIXES: set[str] = {
 
 # Session-scoped allow list (not persisted)
 _session_allowed: set[str] = set()
+# Lowercased first tokens of session entries — a cheap negative filter.
+_session_heads: set[str] = set()
+
+# Parsed JSON list files, keyed by path -> ((st_mtime_ns, st_size), set, sorted).
+# Re-read only when the file's stat signature changes.
+_file_cache: dict[Path, tuple[tuple[int, int], frozenset[str], tuple[str, ...]]] = {}
+
+# Set once CONFIG_DIR has been created by this process.
+_dir_ready = False
 
 
 def _get_active_safe_prefixes() -> set[str]:
@@ -71,17 +90,23 @@ def _get_active_safe_prefixes() -> set[str]:
     return _DEFAULT_SAFE_PREFIXES - _load_disabled_builtins()
 
 
+@profiled("allowlist.should_auto_execute")
 def should_auto_execute(command: str) -> bool:
     """Return True if the command is safe to run without confirmation."""
-    cmd_stripped = command.strip()
+    # Stored entries are lowercase, so the command is case-folded exactly once here.
+    cmd_lower = command.strip().lower()
 
-    if _is_builtin_safe(cmd_stripped):
+    if _is_builtin_safe(cmd_lower):
         return True
 
-    if _matches_allow_list(cmd_stripped, _session_allowed):
+    # An entry can only match if its first token equals the command's.
+    head = _head(cmd_lower)
+
+    if head in _session_heads and _matches_allow_list(cmd_lower, _session_allowed):
         return True
 
-    if _matches_allow_list(cmd_stripped, _load_user_allowed()):
+    user_allowed = _load_user_allowed()
+    if head in _first_tokens(user_allowed) and _matches_allow_list(cmd_lower, user_allowed):
         return True
 
     return False
@@ -89,20 +114,30 @@ def should_auto_execute(command: str) -> bool:
 
 def add_to_session(command: str) -> None:
     """Allow a command (or its prefix) for the rest of this session."""
-    key = _normalize(command)
+    key = _normalize(command).lower()
     _session_allowed.add(key)
+    _session_heads.add(_head(key))
 
 
 def add_to_permanent(command: str) -> None:
     """Persist a command (or its prefix) to the user allow list."""
-    key = _normalize(command)
-    allowed = _load_user_allowed()
-    allowed.add(key)
-    _save_user_allowed(allowed)
+    key = _normalize(command).lower()
+    updated = _sorted_insert(_load_json_entries(ALLOWED_FILE)[1], key)
+    if updated is not None:
+        _save_user_allowed(updated)
 
 
 def get_permanent_list() -> set[str]:
-    return _load_user_allowed()
+    return set(_load_user_allowed())
+
+
+def get_permanent_sorted() -> tuple[str, ...]:
+    """The user allow list in sorted order.
+
+    Returns the same tuple object until the file changes, so callers can
+    cache anything derived from it by identity.
+    """
+    return _load_json_entries(ALLOWED_FILE)[1]
 
 
 def get_session_list() -> set[str]:
@@ -110,13 +145,12 @@ def get_session_list() -> set[str]:
 
 
 def remove_from_permanent(command: str) -> bool:
-    key = _normalize(command)
-    allowed = _load_user_allowed()
-    if key in allowed:
-        allowed.discard(key)
-        _save_user_allowed(allowed)
-        return True
-    return False
+    key = _normalize(command).lower()
+    updated = _sorted_remove(_load_json_entries(ALLOWED_FILE)[1], key)
+    if updated is None:
+        return False
+    _save_user_allowed(updated)
+    return True
 
 
 def get_safe_commands() -> dict[str, bool]:
@@ -125,18 +159,23 @@ def get_safe_commands() -> dict[str, bool]:
     return {cmd: cmd not in disabled for cmd in sorted(_DEFAULT_SAFE_PREFIXES)}
 
 
+def get_disabled_safe_commands() -> frozenset[str]:
+    """Built-in safe commands the user has disabled (same object until the file changes)."""
+    return _load_disabled_builtins()
+
+
 def disable_safe_command(command: str) -> None:
     """Disable a built-in safe command (it will require confirmation)."""
-    disabled = _load_disabled_builtins()
-    disabled.add(command)
-    _save_disabled_builtins(disabled)
+    updated = _sorted_insert(_load_json_entries(DISABLED_BUILTINS_FILE)[1], command)
+    if updated is not None:
+        _save_disabled_builtins(updated)
 
 
 def enable_safe_command(command: str) -> None:
     """Re-enable a previously disabled built-in safe command."""
-    disabled = _load_disabled_builtins()
-    disabled.discard(command)
-    _save_disabled_builtins(disabled)
+    updated = _sorted_remove(_load_json_entries(DISABLED_BUILTINS_FILE)[1], command)
+    if updated is not None:
+        _save_disabled_builtins(updated)
 
 
 # -- Internals ----------------------------------------------------------------
@@ -148,63 +187,181 @@ def _normalize(command: str) -> str:
     For commands with arguments, we store the binary + first subcommand
     (e.g. ``git commit`` from ``git commit -m "msg"``).
     """
-    parts = shlex.split(command.strip())
+    stripped = command.strip()
+    # Only pay for the shlex lexer when quoting/escaping could change tokens.
+    if '"' in stripped or "'" in stripped or "\\" in stripped:
+        parts = shlex.split(stripped)
+    else:
+        parts = stripped.split(None, 2)
     if not parts:
-        return command.strip()
+        return stripped
     # Keep up to 2 tokens (e.g. "git commit", "docker build")
     return " ".join(parts[:2])
 
 
-def _is_builtin_safe(command: str) -> bool:
-    """Check if the command matches any active built-in safe prefix."""
-    cmd_lower = command.lower()
-    for prefix in _get_active_safe_prefixes():
-        if cmd_lower == prefix or cmd_lower.startswith(prefix + " "):
-            return True
-    return False
+def _head(command: str) -> str:
+    """Text up to the first space (the token prefixes are matched on)."""
+    return command.partition(" ")[0]
 
 
-def _matches_allow_list(command: str, allowed: set[str]) -> bool:
-    """Check if the command matches any entry in an allow list."""
-    cmd_lower = command.lower().strip()
-    for entry in allowed:
-        entry_lower = entry.lower()
-        if cmd_lower == entry_lower or cmd_lower.startswith(entry_lower + " "):
-            return True
-    return False
+@lru_cache(maxsize=4)
+def _first_tokens(entries: frozenset[str]) -> frozenset[str]:
+    return frozenset(_head(e) for e in entries)
+
 
+@lru_cache(maxsize=16)
+def _compile_prefixes(prefixes: frozenset[str]) -> re.Pattern[str]:
+    """Compile a set of lowercase prefixes into one anchored matcher.
 
-def _load_user_allowed() -> set[str]:
-    if not ALLOWED_FILE.exists():
-        return set()
+    Alternatives are ordered longest-first; a prefix only matches when it is
+    the whole command or is followed by a space, so ``ls`` accepts ``ls -la``
+    but not ``lsblk``.
+    """
+    if not prefixes:
+        return re.compile(r"(?!)")
+    alternation = "|".join(
+        re.escape(p) for p in sorted(prefixes, key=len, reverse=True)
+    )
+    return re.compile(rf"(?:{alternation})(?: |\Z)")
+
+
+@lru_cache(maxsize=4)
+def _safe_index(
+    disabled: frozenset[str],
+) -> tuple[frozenset[str], dict[str, re.Pattern[str]]]:
+    """Partition active safe prefixes by their first token.
+
+    Returns the single-token prefixes (``ls``, ``cat``) as a set, and a map
+    from first token to a matcher for the remainder of multi-token prefixes
+    (``git`` -> ``status|log|stash list|...``).
+    """
+    single: set[str] = set()
+    tails: dict[str, set[str]] = {}
+    for prefix in _DEFAULT_SAFE_PREFIXES - disabled:
+        head, _, tail = prefix.partition(" ")
+        if tail:
+            tails.setdefault(head, set()).add(tail)
+        else:
+            single.add(head)
+    return frozenset(single), {
+        head: _compile_prefixes(frozenset(rest)) for head, rest in tails.items()
+    }
+
+
+def _is_builtin_safe(cmd_lower: str) -> bool:
+    """Check if the (lowercased) command matches any active built-in safe prefix."""
+    single, multi = _safe_index(_load_disabled_builtins())
+    head, _, rest = cmd_lower.partition(" ")
+    if head in single:
+        return True
+    tail_re = multi.get(head)
+    return tail_re is not None and tail_re.match(rest) is not None
+
+
+def _matches_allow_list(cmd_lower: str, allowed: set[str] | frozenset[str]) -> bool:
+    """Check if the (lowercased, stripped) command matches any entry in an allow list."""
+    pattern = _compile_prefixes(frozenset(allowed))
+    return pattern.match(cmd_lower) is not None
+
+
+def _json_loads(raw: bytes) -> object:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(entries: list[str]) -> bytes:
+    """Serialize a list as indented JSON with a trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(entries, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entries, indent=2) + "\n").encode()
+
+
+@profiled("allowlist.load")
+def _load_json_entries(path: Path) -> tuple[frozenset[str], tuple[str, ...]]:
+    """Load a JSON list file as (set, sorted tuple), reusing the last parse if unchanged."""
+    try:
+        st = path.stat()
+    except OSError:
+        _file_cache.pop(path, None)
+        return frozenset(), ()
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _file_cache.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
     try:
-        data = json.loads(ALLOWED_FILE.read_text())
-        return set(data) if isinstance(data, list) else set()
+        data = _json_loads(path.read_bytes())
     except (json.JSONDecodeError, OSError):
-        return set()
+        return frozenset(), ()
+    # Entries are matched case-insensitively; lowercasing on load also
+    # migrates files written before entries were stored lowercase.
+    entries = (
+        frozenset(e.lower() for e in data if isinstance(e, str))
+        if isinstance(data, list) else frozenset()
+    )
+    ordered = tuple(sorted(entries))
+    _file_cache[path] = (key, entries, ordered)
+    return entries, ordered
+
+
+def _load_json_set(path: Path) -> frozenset[str]:
+    return _load_json_entries(path)[0]
+
+
+def _sorted_insert(ordered: tuple[str, ...], item: str) -> list[str] | None:
+    """Return *ordered* with *item* inserted in place, or None if already present."""
+    i = bisect.bisect_left(ordered, item)
+    if i < len(ordered) and ordered[i] == item:
+        return None
+    updated = list(ordered)
+    updated.insert(i, item)
+    return updated
+
+
+def _sorted_remove(ordered: tuple[str, ...], item: str) -> list[str] | None:
+    """Return *ordered* without *item*, or None if it wasn't present."""
+    i = bisect.bisect_left(ordered, item)
+    if i == len(ordered) or ordered[i] != item:
+        return None
+    return [*ordered[:i], *ordered[i + 1:]]
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a sibling temp file + rename so readers never see a partial file."""
+    global _dir_ready
+    if not _dir_ready:
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        _dir_ready = True
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _load_user_allowed() -> frozenset[str]:
+    return _load_json_set(ALLOWED_FILE)
 
 
-def _save_user_allowed(allowed: set[str]) -> None:
+def _save_user_allowed(allowed: list[str]) -> None:
+    """Persist the user allow list; *allowed* must already be sorted."""
     try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        ALLOWED_FILE.write_text(json.dumps(sorted(allowed), indent=2) + "\n")
+        _write_atomic(ALLOWED_FILE, _json_dumps(allowed))
     except OSError:
         pass
+    _file_cache.pop(ALLOWED_FILE, None)
 
 
-def _load_disabled_builtins() -> set[str]:
-    if not DISABLED_BUILTINS_FILE.exists():
-        return set()
-    try:
-        data = json.loads(DISABLED_BUILTINS_FILE.read_text())
-        return set(data) if isinstance(data, list) else set()
-    except (json.JSONDecodeError, OSError):
-        return set()
+def _load_disabled_builtins() -> frozenset[str]:
+    return _load_json_set(DISABLED_BUILTINS_FILE)
 
 
-def _save_disabled_builtins(disabled: set[str]) -> None:
+def _save_disabled_builtins(disabled: list[str]) -> None:
+    """Persist disabled built-ins; *disabled* must already be sorted."""
     try:
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
-        DISABLED_BUILTINS_FILE.write_text(json.dumps(sorted(disabled), indent=2) + "\n")
+        _write_atomic(DISABLED_BUILTINS_FILE, _json_dumps(disabled))
     except OSError:
         pass
+    _file_cache.pop(DISABLED_BUILTINS_FILE, None)
@@ -1,7 +1,8 @@
 """Instruction complexity classifier.
 
 Determines whether an instruction should be handled locally or
-delegated to a remote AI provider based on heuristics.
+delegated to a remote AI provider, and whether it needs a multi-step
+plan, based on heuristics.
 """
 
 from __future__ import annotations
@@ -105,3 +106,37 @@ def _complexity_score(instruction: str, local_result: str | None, from_fallback:
         score += 2
 
     return score
+
+
+# Multi-step detection lives here (not in orchestrator) so callers can check
+# an instruction without importing the planner.
+_MULTISTEP_MARKERS = re.compile(
+    r"\b(?:and\s+then|then\s+\w|first\s+\w|after\s+that|next\s+\w"
+    r"|finally\s+\w|also\s+\w|plus\s+\w|additionally"
+    r"|set\s*up\b|deploy\b|migrate\b|scaffold\b|bootstrap\b"
+    r"|create.*and.*install|install.*and.*configure)\b",
+    re.IGNORECASE,
+)
+
+_MULTI_ACTION_VERBS = frozenset({
+    "create", "make", "set", "setup", "install", "configure", "build",
+    "deploy", "push", "commit", "add", "remove", "delete", "update",
+    "copy", "move", "rename", "download", "upload", "start", "stop",
+    "init", "initialize", "run", "execute", "open", "close",
+})
+
+
+def is_multistep(instruction: str) -> bool:
+    """Heuristic: does this instruction likely need multiple commands?"""
+    if _MULTISTEP_MARKERS.search(instruction):
+        return True
+
+    words = instruction.lower().split()
+    verb_count = sum(1 for w in words if w in _MULTI_ACTION_VERBS)
+    if verb_count >= 2:
+        return True
+
+    if instruction.count(",") >= 2 and len(words) > 8:
+        return True
+
+    return False
@@ -1,20 +1,74 @@
 """Command-line interface for termai."""
 
-import argparse
+from __future__ import annotations
+
 import os
 import sys
+from typing import TYPE_CHECKING
 
 from termai import __version__
-from termai.generator import generate_command
-from termai.context import SessionContext
-from termai.chat import interactive_chat
-from termai.executor import preview_and_execute
-from termai.logger import print_history
-from termai.orchestrator import is_multistep, generate_plan, execute_plan
-from termai.process_log import print_processes
+from termai._profile import profiled, span
+
+if TYPE_CHECKING:
+    import argparse
+
+    from termai.context import SessionContext
+
+
+# Pre-rendered ``build_parser().format_help()`` (80 columns) so ``--help``
+# doesn't construct the parser. Regenerate whenever build_parser() changes.
+_HELP_TEXT = """\
+usage: termai [-h] [--chat] [-y] [--dry-run] [--history [N]] [--model NAME]
+              [--device {cpu,gpu,cuda,amd,intel}] [--install] [--gui]
+              [--settings] [--setup] [--list-models] [--init-config]
+              [--processes [N]] [--uninstall] [--remote] [--local]
+              [--provider {openai,claude}] [-v] [-V]
+              [instruction]
+
+Local AI-powered terminal assistant
+
+positional arguments:
+  instruction           Natural language instruction to convert into a shell
+                        command
+
+options:
+  -h, --help            show this help message and exit
+  --chat                Start interactive chat mode
+  -y, --yes             Skip confirmation and execute immediately
+  --dry-run             Preview the generated command without executing
+  --history [N]         Show recent command history (default: last 20)
+  --model NAME          Override the LLM model name (e.g.
+                        'Mistral-7B-Instruct-v0.1.Q4_0.gguf')
+  --device {cpu,gpu,cuda,amd,intel}
+                        Device to run the model on (default: cpu)
+  --install             Full installation wizard (terminal) — install binary,
+                        pick a model, configure
+  --gui                 Launch the graphical setup wizard
+  --settings            Open the settings dashboard (model, allow list,
+                        config)
+  --setup               Interactive model selector — pick and download a local
+                        AI model
+  --list-models         Show available AI models with sizes and quality info
+  --init-config         Write a default config file to ~/.termai/config.toml
+  --processes [N]       Show recent multi-step process history (default: last
+                        20)
+  --uninstall           Remove termai binaries, config, and optionally
+                        downloaded models
+  --remote              Force remote AI for this run (requires configured API
+                        key)
+  --local               Force local-only AI for this run (ignore remote
+                        config)
+  --provider {openai,claude}
+                        Override the remote AI provider for this run
+  -v, --verbose         Show diagnostic notes (e.g. when the rule-based
+                        fallback is used)
+  -V, --version         show program's version number and exit
+"""
 
 
 def build_parser() -> argparse.ArgumentParser:
+    import argparse
+
     parser = argparse.ArgumentParser(
         prog="termai",
         description="Local AI-powered terminal assistant",
@@ -116,7 +170,12 @@ def build_parser() -> argparse.ArgumentParser:
         help="Override the remote AI provider for this run",
     )
     parser.add_argument(
-        "--version",
+        "-v", "--verbose",
+        action="store_true",
+        help="Show diagnostic notes (e.g. when the rule-based fallback is used)",
+    )
+    parser.add_argument(
+        "-V", "--version",
         action="version",
         version=f"%(prog)s {__version__}",
     )
@@ -130,14 +189,41 @@ def _should_auto_gui() -> bool:
     return len(sys.argv) <= 1
 
 
+def _is_plain_instruction(argv: list[str]) -> bool:
+    """Return True for ``termai "do X"`` — a single non-flag argument."""
+    return len(argv) == 1 and bool(argv[0]) and not argv[0].startswith("-")
+
+
 def main() -> None:
     if _should_auto_gui():
         from termai.gui import run_gui_wizard
         run_gui_wizard()
         return
 
-    parser = build_parser()
-    args = parser.parse_args()
+    argv = sys.argv[1:]
+    if argv in (["--version"], ["-V"]):
+        print(f"termai {__version__}")
+        return
+    if argv in (["--help"], ["-h"]):
+        print(_HELP_TEXT, end="")
+        return
+    if argv == ["--list-models"]:
+        from termai.models import print_catalog
+        print_catalog()
+        return
+
+    # Hot path: skip building the argparse tree when there are no flags to parse.
+    if _is_plain_instruction(argv):
+        _run_instruction(sys.argv[1], _build_context())
+        return
+
+    with span("cli.parse_args"):
+        parser = build_parser()
+        args = parser.parse_args()
+
+    if args.verbose:
+        import logging
+        logging.basicConfig(level=logging.INFO, format="[termai] %(message)s")
 
     if args.gui:
         from termai.gui import run_gui_wizard
@@ -177,10 +263,12 @@ def main() -> None:
         return
 
     if args.history is not None:
+        from termai.logger import print_history
         print_history(limit=args.history)
         return
 
     if args.processes is not None:
+        from termai.process_log import print_processes
         print_processes(limit=args.processes)
         return
 
@@ -191,37 +279,63 @@ def main() -> None:
     if args.provider:
         os.environ["TERMAI_REMOTE_PROVIDER"] = args.provider
 
-    from termai.generator import set_force_mode
-    if args.remote:
-        set_force_mode("remote")
-    elif args.local:
-        set_force_mode("local")
-
-    ctx = SessionContext()
+    if args.remote or args.local:
+        from termai.generator import set_force_mode
+        set_force_mode("remote" if args.remote else "local")
 
     if args.chat:
-        interactive_chat(ctx)
+        from termai.chat import interactive_chat
+        interactive_chat(_build_context())
         return
 
     if not args.instruction:
         parser.print_help()
         sys.exit(1)
 
-    if is_multistep(args.instruction):
-        plan = generate_plan(args.instruction, ctx)
+    ctx = _build_context()
+    _run_instruction(args.instruction, ctx, dry_run=args.dry_run, auto_yes=args.yes)
+
+
+@profiled("cli.context")
+def _build_context() -> SessionContext:
+    from termai.context import SessionContext
+    return SessionContext()
+
+
+@profiled("cli.run_instruction")
+def _run_instruction(
+    instruction: str,
+    ctx: SessionContext,
+    *,
+    dry_run: bool = False,
+    auto_yes: bool = False,
+) -> None:
+    """Turn one instruction into a plan or a command and preview/execute it."""
+    from termai.classifier import is_multistep
+    if is_multistep(instruction):
+        from termai.orchestrator import generate_plan, execute_plan
+        plan = generate_plan(instruction, ctx)
         if plan and len(plan.steps) > 1:
             execute_plan(plan, ctx,
-                         dry_run=args.dry_run, auto_yes=args.yes)
+                         dry_run=dry_run, auto_yes=auto_yes)
             return
 
-    command = generate_command(args.instruction, ctx)
+    from termai.generator import cancel_generation, submit_generate_command
+    pending = submit_generate_command(instruction, ctx)
+    # Load the preview/safety/execution stack while the model is decoding.
+    from termai.executor import preview_and_execute
+    try:
+        command = pending.result()
+    except KeyboardInterrupt:
+        cancel_generation()
+        raise
     if command:
         preview_and_execute(
             command,
             ctx,
-            dry_run=args.dry_run,
-            auto_yes=args.yes,
-            instruction=args.instruction,
+            dry_run=dry_run,
+            auto_yes=auto_yes,
+            instruction=instruction,
         )
 
 
@@ -25,12 +25,24 @@ Remote AI keys (in [remote] section):
 from __future__ import annotations
 
 import os
+import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 
 CONFIG_DIR = Path.home() / ".termai"
 CONFIG_FILE = CONFIG_DIR / "config.toml"
 
+_DEFAULT_TOML_TEMPLATE = (
+    '[termai]\n'
+    'model = "{model}"\n'
+    'device = "{device}"\n'
+    'max_tokens = {max_tokens}\n'
+    'temperature = {temperature}\n'
+)
+
+# TOML parser module, imported on first use (tomli is a slow import on <3.11).
+_toml_mod = None
+
 
 @dataclass
 class Config:
@@ -54,24 +66,30 @@ class Config:
         """Load config from file and environment, applying overrides."""
         cfg = cls()
 
-        if CONFIG_FILE.exists():
+        try:
+            size = CONFIG_FILE.stat().st_size
+        except OSError:
+            size = 0
+        if size:
             cfg._load_toml()
 
         cfg._apply_env_overrides()
         return cfg
 
     def _load_toml(self) -> None:
-        try:
-            import tomllib
-        except ModuleNotFoundError:
+        global _toml_mod
+        if _toml_mod is None:
             try:
-                import tomli as tomllib  # type: ignore[no-redef]
+                if sys.version_info >= (3, 11):
+                    import tomllib as _toml_mod
+                else:
+                    import tomli as _toml_mod  # type: ignore[no-redef]
             except ModuleNotFoundError:
                 return
 
         try:
-            with open(CONFIG_FILE, "rb") as f:
-                data = tomllib.load(f)
+            # One read + loads() instead of many small reads through load(f).
+            data = _toml_mod.loads(CONFIG_FILE.read_bytes().decode("utf-8"))
         except Exception:
             return
 
@@ -122,16 +140,16 @@ class Config:
 
     def write_default(self) -> None:
         """Write a default config file if one doesn't exist."""
-        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
         if CONFIG_FILE.exists():
             return
-        CONFIG_FILE.write_text(
-            '[termai]\n'
-            f'model = "{self.model}"\n'
-            f'device = "{self.device}"\n'
-            f'max_tokens = {self.max_tokens}\n'
-            f'temperature = {self.temperature}\n'
-        )
+        CONFIG_DIR.mkdir(parents=True, exist_ok=True)
+        # Write beside the target and rename so a crash never leaves a partial file.
+        tmp = CONFIG_FILE.with_suffix(".toml.tmp")
+        tmp.write_text(_DEFAULT_TOML_TEMPLATE.format(
+            model=self.model, device=self.device,
+            max_tokens=self.max_tokens, temperature=self.temperature,
+        ))
+        os.replace(tmp, CONFIG_FILE)
 
 
 _config: Config | None = None
@@ -12,9 +12,11 @@ import platform
 import shutil
 import subprocess
 from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
 from pathlib import Path
 
 
+@lru_cache(maxsize=1)
 def _detect_distro() -> str:
     """Best-effort Linux distro detection; empty string on other OSes."""
     try:
@@ -22,24 +24,85 @@ def _detect_distro() -> str:
         return distro.name(pretty=True)
     except Exception:
         pass
-    release = Path("/etc/os-release")
-    if release.exists():
-        for line in release.read_text().splitlines():
-            if line.startswith("PRETTY_NAME="):
-                return line.split("=", 1)[1].strip('"')
+    try:
+        text = Path("/etc/os-release").read_text()
+    except OSError:
+        return ""
+    for line in text.splitlines():
+        if line.startswith("PRETTY_NAME="):
+            return line.split("=", 1)[1].strip('"')
     return ""
 
 
+_PACKAGE_MANAGERS = ("brew", "apt", "dnf", "yum", "pacman", "zypper", "apk", "nix")
+
+
+@lru_cache(maxsize=1)
 def _detect_package_manager() -> str:
     """Return the name of the first package manager found on PATH."""
-    for pm in ("brew", "apt", "dnf", "yum", "pacman", "zypper", "apk", "nix"):
+    # One lookup per name, in priority order, stopping at the first hit.
+    for pm in _PACKAGE_MANAGERS:
         if shutil.which(pm):
             return pm
     return "unknown"
 
 
+_HEAD_REF_PREFIX = "ref: refs/heads/"
+
+
 def _git_branch() -> str:
-    """Return the current git branch, or empty string if not in a repo."""
+    """Return the current git branch, or empty string if not in a repo.
+
+    Reads ``.git/HEAD`` directly; only falls back to running git when the
+    file has a format we don't recognise.
+    """
+    head = _find_git_head(Path(os.getcwd()))
+    if head is None:
+        return ""
+    try:
+        line = head.read_text().strip()
+    except OSError:
+        return ""
+    if line.startswith(_HEAD_REF_PREFIX):
+        return line[len(_HEAD_REF_PREFIX):]
+    if len(line) >= 40 and all(c in "0123456789abcdef" for c in line):
+        return line[:7]  # detached HEAD
+    return _git_branch_subprocess()
+
+
+def _find_git_head(start: Path) -> Path | None:
+    """Locate the HEAD file of the repository containing *start*."""
+    for directory in (start, *start.parents):
+        dot_git = directory / ".git"
+        if dot_git.is_dir():
+            return dot_git / "HEAD"
+        if dot_git.is_file():
+            # Worktrees and submodules: ".git" holds "gitdir: <path>".
+            try:
+                text = dot_git.read_text().strip()
+            except OSError:
+                return None
+            if not text.startswith("gitdir:"):
+                return None
+            gitdir = Path(text[len("gitdir:"):].strip())
+            if not gitdir.is_absolute():
+                gitdir = directory / gitdir
+            return gitdir / "HEAD"
+    return None
+
+
+def _git_head_key() -> tuple[str, int] | None:
+    """Identify the current HEAD file and its mtime, to detect branch changes."""
+    head = _find_git_head(Path(os.getcwd()))
+    if head is None:
+        return None
+    try:
+        return str(head), head.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _git_branch_subprocess() -> str:
     try:
         result = subprocess.run(
             ["git", "rev-parse", "--abbrev-ref", "HEAD"],
@@ -54,6 +117,23 @@ def _git_branch() -> str:
     return ""
 
 
+_PROMPT_HEADER = (
+    "You are termai, a local AI terminal assistant. "
+    "Given the user's natural language instruction and the system context below, "
+    "generate a single shell command (or a short pipeline) that accomplishes the task.\n"
+    "\n"
+    "Rules:\n"
+    "1. Output ONLY the command — no explanation, no markdown fences.\n"
+    "2. Use commands available on the user's OS and shell.\n"
+    "3. Prefer safe, non-destructive approaches when possible.\n"
+    "4. If the task is ambiguous, pick the most common interpretation.\n"
+    "5. Never fabricate flags or options — use only real ones.\n"
+    "\n"
+    "--- System Context ---\n"
+)
+_PROMPT_FOOTER = "\n--- End Context ---"
+
+
 @dataclass
 class SessionContext:
     """Rich snapshot of the user's current terminal environment."""
@@ -63,24 +143,36 @@ class SessionContext:
     os_name: str = field(default_factory=platform.system)
     os_version: str = field(default_factory=platform.release)
     arch: str = field(default_factory=platform.machine)
-    distro: str = field(default_factory=_detect_distro)
-    package_manager: str = field(default_factory=_detect_package_manager)
     username: str = field(default_factory=lambda: os.environ.get("USER", "unknown"))
     home: str = field(default_factory=lambda: str(Path.home()))
-    git_branch: str = field(default_factory=_git_branch)
     history: list[str] = field(default_factory=list)
-    env_snapshot: dict[str, str] = field(default_factory=dict)
 
-    def __post_init__(self) -> None:
+    # The fields below touch the filesystem or spawn processes, so they are
+    # computed on first use (when a prompt is built) rather than at startup.
+
+    @cached_property
+    def distro(self) -> str:
+        return _detect_distro()
+
+    @cached_property
+    def package_manager(self) -> str:
+        return _detect_package_manager()
+
+    @cached_property
+    def git_branch(self) -> str:
+        self._git_head_key = _git_head_key()
+        return _git_branch()
+
+    @cached_property
+    def env_snapshot(self) -> dict[str, str]:
         # Capture a curated subset of environment variables (avoids leaking secrets).
         safe_keys = {
             "PATH", "LANG", "LC_ALL", "TERM", "EDITOR", "VISUAL",
             "VIRTUAL_ENV", "CONDA_DEFAULT_ENV", "DOCKER_HOST",
             "GOPATH", "CARGO_HOME", "NODE_PATH",
         }
-        self.env_snapshot = {
-            k: v for k, v in os.environ.items() if k in safe_keys
-        }
+        environ = os.environ
+        return {k: environ[k] for k in safe_keys if k in environ}
 
     # -- mutation helpers -----------------------------------------------------
 
@@ -90,13 +182,26 @@ class SessionContext:
 
     def refresh_cwd(self) -> None:
         """Re-read the current working directory (useful after cd)."""
-        self.cwd = os.getcwd()
-        self.git_branch = _git_branch()
+        try:
+            self.cwd = os.getcwd()
+        except OSError:
+            return  # the directory was removed; keep the last known cwd
+        # Drop the cached branch only if HEAD moved (checkout, switch, another
+        # repo); it is re-read the next time a prompt needs it.
+        if "git_branch" in self.__dict__ and _git_head_key() != self._git_head_key:
+            del self.__dict__["git_branch"]
 
     # -- prompt generation ----------------------------------------------------
 
     def summary(self) -> str:
         """One-paragraph context string for inclusion in the AI prompt."""
+        # Only cwd, branch and recent history change during a session.
+        recent = self.history[-5:] if self.history else ["(none)"]
+        key = (self.cwd, self.git_branch, tuple(recent))
+        cached = self.__dict__.get("_summary_cache")
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
         parts = [
             f"OS: {self.os_name} {self.os_version} ({self.arch})",
             f"Shell: {self.shell}",
@@ -113,25 +218,18 @@ class SessionContext:
         if self.env_snapshot.get("CONDA_DEFAULT_ENV"):
             parts.append(f"Conda env: {self.env_snapshot['CONDA_DEFAULT_ENV']}")
 
-        recent = self.history[-5:] if self.history else ["(none)"]
         parts.append(f"Recent commands: {'; '.join(recent)}")
-        return "\n".join(parts)
+        text = "\n".join(parts)
+        self._summary_cache = (key, text)
+        return text
 
     def as_system_prompt(self) -> str:
         """Full system prompt fed to the LLM before each generation."""
-        return (
-            "You are termai, a local AI terminal assistant. "
-            "Given the user's natural language instruction and the system context below, "
-            "generate a single shell command (or a short pipeline) that accomplishes the task.\n"
-            "\n"
-            "Rules:\n"
-            "1. Output ONLY the command — no explanation, no markdown fences.\n"
-            "2. Use commands available on the user's OS and shell.\n"
-            "3. Prefer safe, non-destructive approaches when possible.\n"
-            "4. If the task is ambiguous, pick the most common interpretation.\n"
-            "5. Never fabricate flags or options — use only real ones.\n"
-            "\n"
-            "--- System Context ---\n"
-            f"{self.summary()}\n"
-            "--- End Context ---"
-        )
+        summary = self.summary()
+        cached = self.__dict__.get("_prompt_cache")
+        # summary() hands back the same string object while nothing changed.
+        if cached is not None and cached[0] is summary:
+            return cached[1]
+        prompt = _PROMPT_HEADER + summary + _PROMPT_FOOTER
+        self._prompt_cache = (summary, prompt)
+        return prompt
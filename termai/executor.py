@@ -12,27 +12,35 @@ in parallel using preview_and_execute_batch().
 
 from __future__ import annotations
 
+import asyncio
 import re
 import subprocess
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import TYPE_CHECKING
 
 from termai.safety import check_command, format_warnings
 from termai.allowlist import should_auto_execute, add_to_session, add_to_permanent
-from termai.logger import log_command
+from termai.logger import log_command, log_command_many
 from termai.plugins import get_registry
 
 if TYPE_CHECKING:
     from termai.context import SessionContext
 
-CYAN = "\033[1;36m"
-GREEN = "\033[1;32m"
-YELLOW = "\033[0;33m"
-RED = "\033[1;31m"
-BOLD = "\033[1m"
-DIM = "\033[2m"
-RESET = "\033[0m"
+# Colour only when writing to a terminal; pipes and files get plain text.
+_TTY = sys.stdout is not None and sys.stdout.isatty()
+
+CYAN = "\033[1;36m" if _TTY else ""
+GREEN = "\033[1;32m" if _TTY else ""
+YELLOW = "\033[0;33m" if _TTY else ""
+RED = "\033[1;31m" if _TTY else ""
+BOLD = "\033[1m" if _TTY else ""
+DIM = "\033[2m" if _TTY else ""
+RESET = "\033[0m" if _TTY else ""
+
+# Preview box pieces per border colour, assembled once at import.
+_PREVIEW_TOP = {c: f"  {c}┌─ Command Preview ─────────────────────{RESET}" for c in (CYAN, RED)}
+_PREVIEW_BAR = {c: f"  {c}│{RESET}  " for c in (CYAN, RED)}
+_PREVIEW_BOTTOM = {c: f"  {c}└───────────────────────────────────────{RESET}" for c in (CYAN, RED)}
 
 
 def preview_and_execute(
@@ -50,19 +58,19 @@ def preview_and_execute(
     """
     warnings = check_command(command)
 
-    print()
+    # Build the whole preview and emit it with one write.
     border_color = RED if warnings else CYAN
-    print(f"  {border_color}┌─ Command Preview ─────────────────────{RESET}")
-    for line in command.splitlines():
-        print(f"  {border_color}│{RESET}  {line}")
-    print(f"  {border_color}└───────────────────────────────────────{RESET}")
-
+    bar = _PREVIEW_BAR[border_color]
+    lines = ["", _PREVIEW_TOP[border_color]]
+    lines.extend(bar + line for line in command.splitlines())
+    lines.append(_PREVIEW_BOTTOM[border_color])
     if warnings:
-        print()
-        print(format_warnings(warnings))
+        lines += ["", format_warnings(warnings)]
+    if dry_run:
+        lines += ["", f"  {CYAN}(dry-run mode — command will NOT be executed){RESET}"]
+    sys.stdout.write("\n".join(lines) + "\n")
 
     if dry_run:
-        print(f"\n  {CYAN}(dry-run mode — command will NOT be executed){RESET}")
         return None
 
     # Auto-execute safe / allowed commands (unless they have safety warnings)
@@ -103,12 +111,11 @@ def _prompt_with_options(command: str, *, has_warnings: bool) -> str | None:
       s  — allow for this session
       n  — cancel (default)
     """
-    print()
     warn_tag = f" {YELLOW}(has warnings){RESET}" if has_warnings else ""
-    print(f"  {BOLD}y{RESET} execute        "
-          f"{BOLD}a{RESET} always allow   "
-          f"{BOLD}s{RESET} session allow   "
-          f"{BOLD}n{RESET} cancel{warn_tag}")
+    sys.stdout.write(f"\n  {BOLD}y{RESET} execute        "
+                     f"{BOLD}a{RESET} always allow   "
+                     f"{BOLD}s{RESET} session allow   "
+                     f"{BOLD}n{RESET} cancel{warn_tag}\n")
 
     try:
         answer = input(f"\n  {BOLD}Run?{RESET} [y/a/s/N] ").strip().lower()
@@ -169,6 +176,7 @@ def run_command(
         success = False
 
     ctx.record(command)
+    # Cheap when nothing moved: a getcwd() and a .git/HEAD mtime check.
     ctx.refresh_cwd()
     log_command(command, instruction=instruction, success=success)
 
@@ -180,13 +188,19 @@ def run_command(
 
 # -- Parallel execution -------------------------------------------------------
 
+# Every alternative is anchored on one metacharacter and consumes a bounded
+# or non-overlapping run after it, so a search is linear in the command length.
 _DEPENDENCY_MARKERS = re.compile(
-    r"\$\(|`.*`"        # command substitution
+    r"\$\(|`[^`\n]*`"   # command substitution
     r"|\|\s*\w"          # pipe to another command
     r"|&&|;\s*\w"        # chained commands
     r"|>\s|>>"           # output redirection
     r"|\$\w"             # variable references
 )
+# Every _DEPENDENCY_MARKERS alternative contains one of these characters, so
+# commands without any of them can skip the regex.
+_FAST_MARKERS = frozenset("$|&;>`")
+_WRITE_CMDS = frozenset({"mv", "cp", "rm", "touch", "mkdir", "rmdir", ">", ">>", "tee"})
 
 
 def group_independent(commands: list[str]) -> list[list[str]]:
@@ -208,13 +222,11 @@ def group_independent(commands: list[str]) -> list[list[str]]:
     files_touched: set[str] = set()
 
     for cmd in commands:
-        has_deps = bool(_DEPENDENCY_MARKERS.search(cmd))
-
-        words = cmd.split()
-        writes_file = any(
-            w in ("mv", "cp", "rm", "touch", "mkdir", "rmdir", ">", ">>", "tee")
-            for w in words[:3]
+        has_deps = (
+            not _FAST_MARKERS.isdisjoint(cmd)
+            and _DEPENDENCY_MARKERS.search(cmd) is not None
         )
+        writes_file = not _WRITE_CMDS.isdisjoint(cmd.split(None, 3)[:3])
 
         if has_deps or writes_file:
             sequential.append(cmd)
@@ -277,7 +289,7 @@ def _run_parallel(
     instruction: str = "",
 ) -> list[bool | None]:
     """Run a batch of independent commands in parallel after preview."""
-    approved: list[str] = []
+    approved: list[tuple[int, str]] = []
     results: list[bool | None] = [None] * len(commands)
 
     for i, cmd in enumerate(commands):
@@ -296,39 +308,46 @@ def _run_parallel(
     if not approved:
         return results
 
-    with ThreadPoolExecutor(max_workers=min(len(approved), 4)) as pool:
-        futures = {}
-        for idx, cmd in approved:
-            print(f"  {DIM}⟶ {cmd}{RESET}")
-            f = pool.submit(_exec_single, cmd, ctx, instruction)
-            futures[f] = idx
-
-        for future in as_completed(futures):
-            idx = futures[future]
-            results[idx] = future.result()
+    outcomes = asyncio.run(_run_approved(approved, ctx))
+    for idx, ok in outcomes:
+        results[idx] = ok
+    # One history append for the whole batch.
+    log_command_many((commands[idx], instruction, ok) for idx, ok in outcomes)
 
     return results
 
 
-def _exec_single(command: str, ctx: "SessionContext", instruction: str) -> bool:
-    """Execute a single command (used by parallel runner)."""
+async def _run_approved(
+    approved: list[tuple[int, str]],
+    ctx: "SessionContext",
+) -> list[tuple[int, bool]]:
+    """Run approved commands as concurrent subprocesses on one event loop."""
+    for _, cmd in approved:
+        print(f"  {DIM}⟶ {cmd}{RESET}")
+
+    async def run(idx: int, cmd: str) -> tuple[int, bool]:
+        return idx, await _exec_single(cmd, ctx)
+
+    return await asyncio.gather(*(run(idx, cmd) for idx, cmd in approved))
+
+
+async def _exec_single(command: str, ctx: "SessionContext") -> bool:
+    """Execute a single command (used by parallel runner; the caller logs it)."""
     try:
-        result = subprocess.run(
-            command, shell=True, cwd=ctx.cwd,
-            capture_output=True, text=True,
+        proc = await asyncio.create_subprocess_shell(
+            command, cwd=ctx.cwd,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
         )
-        success = result.returncode == 0
-        if result.stdout:
-            print(result.stdout, end="")
-        if result.stderr:
-            print(result.stderr, end="", file=sys.stderr)
+        stdout, stderr = await proc.communicate()
+        success = proc.returncode == 0
+        if stdout:
+            print(stdout.decode(errors="replace"), end="")
+        if stderr:
+            print(stderr.decode(errors="replace"), end="", file=sys.stderr)
 
         status = f"{GREEN}✓{RESET}" if success else f"{RED}✗{RESET}"
         print(f"  {status} {DIM}{command}{RESET}")
-
-        log_command(command, instruction=instruction, success=success)
         return success
     except Exception as e:
         print(f"  {RED}✗ {command}: {e}{RESET}")
-        log_command(command, instruction=instruction, success=False)
         return False
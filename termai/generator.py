@@ -11,13 +11,20 @@ to the remote provider for higher-quality results.
 
 from __future__ import annotations
 
+import logging
+import os
+import platform
 import re
+import threading
 from typing import TYPE_CHECKING
 
-from termai.model import LocalModel
-
 if TYPE_CHECKING:
+    from concurrent.futures import Future
+
     from termai.context import SessionContext
+    from termai.model import LocalModel
+
+log = logging.getLogger(__name__)
 
 CYAN = "\033[1;36m"
 DIM = "\033[2m"
@@ -27,6 +34,12 @@ RESET = "\033[0m"
 _model: LocalModel | None = None
 _force_mode: str | None = None  # "remote", "local", or None (auto)
 
+# Decoding stops at the closing fence or a blank line outside any heredoc
+# (see _scan_command), so the budget only matters for runaway output; it
+# stays well above real command lengths.  A command that still reaches it,
+# or ends inside an open fence or heredoc, is discarded.
+_COMMAND_MAX_TOKENS = 256
+
 
 def set_force_mode(mode: str | None) -> None:
     """Override delegation: 'remote', 'local', or None for auto."""
@@ -37,10 +50,41 @@ def set_force_mode(mode: str | None) -> None:
 def _get_model() -> LocalModel:
     global _model
     if _model is None:
+        from termai.model import LocalModel
         _model = LocalModel()
     return _model
 
 
+def submit_generate_command(instruction: str, ctx: "SessionContext") -> Future[str | None]:
+    """Start generate_command() on a background thread and return its future.
+
+    Lets the caller do other startup work while the model decodes.  The
+    thread is a daemon and is never joined, so Ctrl+C in the caller ends the
+    process at once even while a model load or remote call is still running.
+    """
+    from concurrent.futures import Future
+
+    # Reset here rather than in the worker, so a cancel_generation() issued
+    # while the model is still loading is not lost.
+    _get_model().reset_cancel()
+    future: Future[str | None] = Future()
+
+    def run() -> None:
+        try:
+            future.set_result(generate_command(instruction, ctx))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="termai-generate", daemon=True).start()
+    return future
+
+
+def cancel_generation() -> None:
+    """Stop an in-flight local generation at its next token."""
+    if _model is not None:
+        _model.cancel()
+
+
 def generate_command(instruction: str, ctx: "SessionContext") -> str | None:
     """Convert a natural language instruction into a shell command.
 
@@ -88,9 +132,18 @@ def _generate_with_llm(
     system_prompt = ctx.as_system_prompt()
     user_prompt = f"Instruction: {instruction}"
 
-    raw = model.generate(system_prompt, user_prompt, max_tokens=256)
+    raw = model.generate(
+        system_prompt, user_prompt, max_tokens=_COMMAND_MAX_TOKENS, stop=_command_end,
+    )
+    # Never hand a cut-off command to preview/execute as if it were whole.
+    if raw and model.hit_token_limit:
+        log.info("Model output hit the token limit — falling back.")
+        return _generate_fallback(instruction, ctx)
+    if raw and _scan_command(raw)[1]:
+        log.info("Model output ends inside an open fence or heredoc — falling back.")
+        return _generate_fallback(instruction, ctx)
     if not raw:
-        print("[termai] Model returned empty response — falling back.")
+        log.info("Model returned empty response — falling back.")
         return _generate_fallback(instruction, ctx)
 
     command = _clean_model_output(raw)
@@ -129,77 +182,153 @@ def _generate_with_remote(
         return local_result
 
 
+# "<<EOF", "<<-'EOF'", '<< "END"'; not here-strings ("<<<word").
+_HEREDOC_RE = re.compile(r"(?<!<)<<(?!<)(-?)\s*(['\"]?)([A-Za-z_]\w*)\2")
+
+
+def _scan_command(text: str) -> tuple[int, bool]:
+    """Find where generated command text ends.
+
+    Returns ``(cut, unclosed)``: *cut* is the index just past the closing
+    fence of a fenced answer, or past the first blank line outside any
+    heredoc of a plain one (-1 if neither has appeared); *unclosed* says
+    whether the text up to there is still inside a fence or heredoc.
+    """
+    pos = len(text) - len(text.lstrip())
+    lines = text[pos:].split("\n")
+    fenced = lines[0].startswith("```")
+    pending: list[tuple[str, bool]] = []  # heredoc (delimiter, strip tabs), in order
+    for i, line in enumerate(lines):
+        end = pos + len(line)
+        if pending:
+            delimiter, strip_tabs = pending[0]
+            if (line.lstrip("\t") if strip_tabs else line).rstrip("\r") == delimiter:
+                pending.pop(0)
+        elif fenced and i > 0 and line.startswith("```"):
+            return pos + 3, False
+        elif not fenced and not line.strip() and i < len(lines) - 1:
+            return end + 1, False
+        elif not (fenced and i == 0):
+            pending.extend((m[3], m[1] == "-") for m in _HEREDOC_RE.finditer(line))
+        pos = end + 1
+    return -1, fenced or bool(pending)
+
+
+def _command_end(text: str) -> int:
+    """``stop`` callback for LocalModel.generate(): where the command ends."""
+    return _scan_command(text)[0]
+
+
+_FENCE_RE = re.compile(r"^```(?:bash|sh|zsh)?\s*\n?(.*?)\n?```$", re.DOTALL)
+_COMMENT_LINE_RE = re.compile(r"^#.*\n?", re.MULTILINE)
+# Every line boundary str.splitlines() recognises besides "\n" (CRLF first).
+_LINE_BREAK_RE = re.compile("\r\n|[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
 def _clean_model_output(raw: str) -> str:
     """Strip markdown fences, leading $, and excess whitespace."""
     text = raw.strip()
 
-    fence_pattern = re.compile(r"^```(?:bash|sh|zsh)?\s*\n?(.*?)\n?```$", re.DOTALL)
-    m = fence_pattern.match(text)
-    if m:
-        text = m.group(1).strip()
+    if text.startswith("```"):
+        m = _FENCE_RE.match(text)
+        if m:
+            text = m.group(1).strip()
 
     if text.startswith("$ "):
         text = text[2:]
 
-    lines = [ln for ln in text.splitlines() if not ln.startswith("#")]
-    return "\n".join(lines).strip()
+    # Normalize CRLF (and other) line breaks so no "\r" is left on a line.
+    text = _LINE_BREAK_RE.sub("\n", text)
+    return _COMMENT_LINE_RE.sub("", text).strip()
 
 
 # ---------------------------------------------------------------------------
 # Rule-based fallback (no AI required)
 # ---------------------------------------------------------------------------
 
-_FALLBACK_MAP: list[tuple[list[str], str]] = [
-    (["list", "files"],            "ls -la"),
-    (["list", "directory"],        "ls -la"),
-    (["disk", "usage"],            "df -h"),
-    (["disk", "space"],            "du -sh *"),
-    (["memory", "usage"],          "free -h" if __import__("platform").system() == "Linux" else "vm_stat"),
-    (["current", "directory"],     "pwd"),
-    (["network", "interfaces"],    "ifconfig" if __import__("platform").system() == "Darwin" else "ip addr"),
-    (["running", "processes"],     "ps aux"),
-    (["system", "info"],           "uname -a"),
-    (["find", "python", "files"],  'find . -name "*.py" -type f'),
-    (["find", "log", "files"],     'find . -name "*.log" -type f'),
-    (["count", "lines"],           "wc -l"),
-    (["git", "status"],            "git status"),
-    (["git", "log"],               "git log --oneline -10"),
-    (["git", "history"],           "git log --oneline -10"),
-    (["docker", "containers"],     "docker ps -a"),
-    (["docker", "images"],         "docker images"),
-    (["command", "history"],       "cat ~/.zsh_history | tail -30" if __import__("os").environ.get("SHELL", "").endswith("zsh") else "cat ~/.bash_history | tail -30"),
-    (["history"],                  "cat ~/.zsh_history | tail -30" if __import__("os").environ.get("SHELL", "").endswith("zsh") else "cat ~/.bash_history | tail -30"),
-    (["whoami"],                   "whoami"),
-    (["uptime"],                   "uptime"),
-    (["date"],                     "date"),
-    (["hostname"],                 "hostname"),
-    (["cpu", "info"],              "sysctl -n machdep.cpu.brand_string" if __import__("platform").system() == "Darwin" else "lscpu"),
-    (["open", "ports"],            "lsof -i -P -n | grep LISTEN"),
-    (["environment", "variables"], "env"),
-    (["path"],                     "echo $PATH | tr ':' '\\n'"),
+_SYSTEM = platform.system()
+_HISTORY_CMD = (
+    "cat ~/.zsh_history | tail -30" if os.environ.get("SHELL", "").endswith("zsh")
+    else "cat ~/.bash_history | tail -30"
+)
+_CPU_INFO_CMD = "sysctl -n machdep.cpu.brand_string" if _SYSTEM == "Darwin" else "lscpu"
+
+_FALLBACK_MAP: list[tuple[frozenset[str], str]] = [
+    (frozenset({"list", "files"}),            "ls -la"),
+    (frozenset({"list", "directory"}),        "ls -la"),
+    (frozenset({"disk", "usage"}),            "df -h"),
+    (frozenset({"disk", "space"}),            "du -sh *"),
+    (frozenset({"memory", "usage"}),          "free -h" if _SYSTEM == "Linux" else "vm_stat"),
+    (frozenset({"current", "directory"}),     "pwd"),
+    (frozenset({"network", "interfaces"}),    "ifconfig" if _SYSTEM == "Darwin" else "ip addr"),
+    (frozenset({"running", "processes"}),     "ps aux"),
+    (frozenset({"system", "info"}),           "uname -a"),
+    (frozenset({"find", "python", "files"}),  'find . -name "*.py" -type f'),
+    (frozenset({"find", "log", "files"}),     'find . -name "*.log" -type f'),
+    (frozenset({"count", "lines"}),           "wc -l"),
+    (frozenset({"git", "status"}),            "git status"),
+    (frozenset({"git", "log"}),               "git log --oneline -10"),
+    (frozenset({"git", "history"}),           "git log --oneline -10"),
+    (frozenset({"docker", "containers"}),     "docker ps -a"),
+    (frozenset({"docker", "images"}),         "docker images"),
+    (frozenset({"command", "history"}),       _HISTORY_CMD),
+    (frozenset({"history"}),                  _HISTORY_CMD),
+    (frozenset({"whoami"}),                   "whoami"),
+    (frozenset({"uptime"}),                   "uptime"),
+    (frozenset({"date"}),                     "date"),
+    (frozenset({"hostname"}),                 "hostname"),
+    (frozenset({"cpu", "info"}),              _CPU_INFO_CMD),
+    (frozenset({"open", "ports"}),            "lsof -i -P -n | grep LISTEN"),
+    (frozenset({"environment", "variables"}), "env"),
+    (frozenset({"path"}),                     "echo $PATH | tr ':' '\\n'"),
 ]
 
 
+def _build_keyword_index() -> dict[str, tuple[int, ...]]:
+    """Map each fallback keyword to the indices of the rules that use it."""
+    index: dict[str, list[int]] = {}
+    for i, (keywords, _) in enumerate(_FALLBACK_MAP):
+        for kw in keywords:
+            index.setdefault(kw, []).append(i)
+    return {kw: tuple(rules) for kw, rules in index.items()}
+
+
+_KEYWORD_RULES = _build_keyword_index()
+# Instruction words: runs of ASCII letters, so "files," or "(disk)" still match.
+_WORD_RE = re.compile(r"[a-z]+")
+# Best score each rule can reach (all keywords hit); larger rules can score higher.
+_MAX_SCORE = [1.0 + len(keywords) * 0.01 for keywords, _ in _FALLBACK_MAP]
+
+
 def _generate_fallback(instruction: str, ctx: "SessionContext") -> str:
     """Keyword-matching fallback when no AI model is loaded."""
-    words = instruction.lower().split()
+    words = frozenset(_WORD_RE.findall(instruction.lower()))
+    # Only rules sharing at least one keyword with the instruction can score.
+    candidates = {i for word in words for i in _KEYWORD_RULES.get(word, ())}
+
     best_match = ""
     best_score = 0.0
-
-    for keywords, cmd in _FALLBACK_MAP:
-        hits = sum(1 for kw in keywords if kw in words)
-        if hits == 0:
-            continue
+    best_index = len(_FALLBACK_MAP)
+
+    # Visit rules with the highest reachable score first and stop once no
+    # remaining rule can beat the best so far.  Equal scores go to the rule
+    # listed first in _FALLBACK_MAP, as before.
+    for i in sorted(candidates, key=lambda i: (-_MAX_SCORE[i], i)):
+        if best_score > _MAX_SCORE[i]:
+            break
+        keywords, cmd = _FALLBACK_MAP[i]
+        hits = len(keywords & words)
         # Prefer rules where ALL keywords match (ratio == 1.0),
         # breaking ties by absolute number of matched keywords.
         ratio = hits / len(keywords)
         score = ratio + hits * 0.01
-        if score > best_score:
+        if score > best_score or (score == best_score and i < best_index):
             best_score = score
             best_match = cmd
+            best_index = i
 
     if best_match:
-        print("[termai] (using rule-based fallback)")
+        log.info("(using rule-based fallback)")
         return best_match
 
     print("[termai] Could not generate a command. Try rephrasing or install a local model.")
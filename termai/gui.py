@@ -10,9 +10,11 @@ dependencies, works on every OS regardless of what's installed.
 
 from __future__ import annotations
 
+import gzip
 import json
 import os
 import platform
+import re
 import shutil
 import subprocess
 import sys
@@ -21,18 +23,39 @@ import time
 import urllib.error
 import urllib.request
 import webbrowser
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import zlib
+from collections import deque
+from http.server import HTTPServer, ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
-
-from termai.config import CONFIG_DIR, CONFIG_FILE, get_config
-from termai.models import CATALOG, MODEL_DIR
+from urllib.parse import urlparse, parse_qs
+
+import termai.config as _cfg
+from termai.config import CONFIG_DIR, CONFIG_FILE, Config, get_config
+from termai.logger import LOG_FILE, read_history
+from termai.models import CATALOG, MODEL_DIR, _save_model_choice as _save_model_choice_impl
+from termai.process_log import clear_processes, read_processes
+from termai.remote import get_remote_provider, reset_remote_provider
 from termai.allowlist import (
-    get_permanent_list, add_to_permanent, remove_from_permanent,
-    get_safe_commands, disable_safe_command, enable_safe_command,
+    get_permanent_sorted, add_to_permanent, remove_from_permanent,
+    get_safe_commands, get_disabled_safe_commands,
+    disable_safe_command, enable_safe_command,
 )
 
+try:
+    import orjson  # optional: faster serialization of the API payloads
+except ImportError:
+    orjson = None
+
 MODEL_BASE_URL = "https://gpt4all.io/models/gguf/"
 
+
+def _dumps(obj: object) -> bytes:
+    """Compact JSON bytes for API payloads."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
 INSTALL_DIRS_UNIX = [
     Path("/usr/local/bin"),
     Path.home() / ".local" / "bin",
@@ -42,19 +65,98 @@ INSTALL_DIRS_UNIX = [
 _download_state: dict = {
     "active": False, "cancelled": False, "pct": 0,
     "downloaded_mb": 0, "total_mb": 0, "speed": "", "eta": "",
-    "done": False, "error": "", "logs": [],
+    "done": False, "error": "", "run": 0,
 }
+# Install log lines, kept apart from _download_state so payloads can carry
+# just the lines a client hasn't seen.  _logs_total never resets, so a line's
+# absolute index stays valid across runs.
+_LOG_LIMIT = 200
+_logs: deque[dict] = deque(maxlen=_LOG_LIMIT)
+_logs_total = 0
+# Handlers run on their own threads.  All writes go through _set_state() /
+# _log(), which hold this condition's lock, bump _state_version and wake any
+# /api/events listeners.
+_state_changed = threading.Condition()
+_state_version = 0
+# Open /api/events streams; changes (and /api/heartbeat) notify _heartbeat,
+# which the shutdown watchdog sleeps on.
+_heartbeat = threading.Condition()
+_open_streams = 0
+
+
+def _set_state(**changes) -> None:
+    # Copy-on-write: the dict _download_state points at is never mutated, so
+    # a reader holding a reference always sees one complete state.
+    global _download_state
+    with _state_changed:
+        _download_state = {**_download_state, **changes}
+        _notify_locked()
 
 
 def _log(msg: str, level: str = "ok") -> None:
-    _download_state["logs"].append({"msg": msg, "level": level})
+    global _logs_total
+    with _state_changed:
+        _logs.append({"msg": msg, "level": level})
+        _logs_total += 1
+        _notify_locked()
+
+
+def _begin_run() -> int:
+    """Start a new install/download run and return its id.
+
+    Drops the previous run's log; the page only follows events whose
+    ``run`` matches the id it got back from the POST.
+    """
+    global _download_state
+    with _state_changed:
+        _logs.clear()
+        run = _download_state["run"] + 1
+        _download_state = {**_download_state, "active": True, "done": False, "error": "", "run": run}
+        _notify_locked()
+        return run
+
+
+def _notify_locked() -> None:
+    global _state_version
+    _state_version += 1
+    _state_changed.notify_all()
+
+
+def _state_json(since: int = 0) -> bytes:
+    with _state_changed:
+        snapshot = _state_snapshot_locked(since)
+    return _dumps(snapshot)
+
+
+def _state_snapshot_locked(since: int) -> dict:
+    """_download_state plus the log lines from absolute index *since* on.
+
+    ``log_base`` is the absolute index of the first line in ``logs``.  Only
+    the copy needs the lock; callers serialize it after releasing it.
+    """
+    base = _logs_total - len(_logs)
+    start = max(since, base)
+    logs = [_logs[i] for i in range(start - base, len(_logs))]
+    return {**_download_state, "logs": logs, "log_base": start}
+
+
+def _install_running() -> bool:
+    """Whether an install or download is in progress."""
+    state = _download_state  # one snapshot, not three separate reads
+    return state["active"] and not state["done"] and not state["error"]
+
+
+# Answer to _is_installed(); it only changes when the wizard installs.
+_installed: bool | None = None
 
 
 def _is_installed() -> bool:
     """Check if termai is meaningfully set up."""
-    has_binary = shutil.which("termai") is not None or getattr(sys, "frozen", False)
-    has_config = CONFIG_FILE.exists()
-    return has_binary and has_config
+    global _installed
+    if _installed is None:
+        has_binary = shutil.which("termai") is not None or getattr(sys, "frozen", False)
+        _installed = has_binary and CONFIG_FILE.exists()
+    return _installed
 
 
 def _get_current_model() -> str:
@@ -62,19 +164,76 @@ def _get_current_model() -> str:
     return cfg.model
 
 
-def _models_state() -> list[dict]:
+# Static catalog fields, serialized once.  Each entry is left open (no
+# closing brace) so the per-request "installed"/"active" flags can be appended.
+_CATALOG_JSON = [
+    _dumps({
+        "name": m.name, "filename": m.filename,
+        "size_gb": m.size_gb, "params": m.params,
+        "min_ram": m.min_ram, "quality": m.quality,
+        "description": m.description,
+    })[:-1]
+    for m in CATALOG
+]
+_JSON_BOOL = {True: b"true", False: b"false"}
+
+# /api/models is fetched on every settings render; the catalog only changes
+# on switch/download, which invalidate this explicitly.
+_MODELS_JSON_TTL = 2.0
+_models_json_cache: tuple[float, bytes] | None = None
+
+
+def _models_json() -> bytes:
+    global _models_json_cache
+    now = time.monotonic()
+    if _models_json_cache is not None and now - _models_json_cache[0] < _MODELS_JSON_TTL:
+        return _models_json_cache[1]
     current = _get_current_model()
-    return [
-        {
-            "name": m.name, "filename": m.filename,
-            "size_gb": m.size_gb, "params": m.params,
-            "min_ram": m.min_ram, "quality": m.quality,
-            "description": m.description,
-            "installed": (MODEL_DIR / m.filename).exists(),
-            "active": m.filename == current,
-        }
-        for m in CATALOG
-    ]
+    present = _installed_filenames()
+    data = b"[" + b",".join(
+        b'%s,"installed":%s,"active":%s}' % (
+            entry, _JSON_BOOL[m.filename in present], _JSON_BOOL[m.filename == current],
+        )
+        for entry, m in zip(_CATALOG_JSON, CATALOG)
+    ) + b"]"
+    _models_json_cache = (now, data)
+    return data
+
+
+def _installed_filenames() -> set[str]:
+    """Names of files in MODEL_DIR, from one directory listing."""
+    try:
+        with os.scandir(MODEL_DIR) as it:
+            return {e.name for e in it if e.is_file()}
+    except OSError:
+        return set()
+
+
+def _invalidate_models_state() -> None:
+    global _models_json_cache
+    _models_json_cache = None
+
+
+# Serialized allow-list payloads, keyed on the identity of the allowlist
+# module's cached parse (it returns the same object until the file changes).
+_json_cache: dict[str, tuple[object, bytes]] = {}
+
+
+def _cached_json(name: str, source: object, build) -> bytes:
+    cached = _json_cache.get(name)
+    if cached is not None and cached[0] is source:
+        return cached[1]
+    data = _dumps(build(source))
+    _json_cache[name] = (source, data)
+    return data
+
+
+def _allowlist_json() -> bytes:
+    return _cached_json("allowlist", get_permanent_sorted(), list)
+
+
+def _safe_commands_json() -> bytes:
+    return _cached_json("safe", get_disabled_safe_commands(), lambda _: get_safe_commands())
 
 
 # -- Shared CSS ---------------------------------------------------------------
@@ -274,14 +433,518 @@ h2 { font-size: 20px; font-weight: 600; margin-bottom: 12px; }
 """
 
 
+def _minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r":\s+", ":", css)  # only after ':' — a space before it is a descendant selector
+    return re.sub(r"\s*([{};,])\s*", r"\1", css).strip()
+
+
+# -- Page script ---------------------------------------------------------------
+# A plain string (single braces), served as a cached static asset; per-page
+# data comes from the window.__TERMAI__ bootstrap in _build_html.
+
+_JS = """
+const BOOT = window.__TERMAI__;
+const MODELS = BOOT.models;
+let allowedCmds = BOOT.allowedCmds;
+let safeCommands = BOOT.safeCommands;
+let selectedModel = 0;
+const showSettings = BOOT.showSettings;
+
+// Init: show wizard or settings
+if (showSettings) openSettings();
+
+function showStep(n) {
+  document.querySelectorAll('.step').forEach(s => s.classList.remove('active'));
+  document.getElementById('step-' + n).classList.add('active');
+}
+
+function openSettings() {
+  document.getElementById('wizard-view').style.display = 'none';
+  document.getElementById('settings-view').style.display = 'block';
+  // One round-trip for everything the first settings paint needs.
+  fetch('/api/state?parts=models,allowlist,safe,config').then(r => r.json()).then(st => {
+    paintSettingsModels(st.models);
+    paintAllowList(st.allowlist);
+    paintSafeList(st.safe);
+    paintConfig(st.config);
+  });
+}
+
+function switchTab(name, btn) {
+  document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
+  document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
+  document.getElementById('tab-' + name).classList.add('active');
+  btn.classList.add('active');
+  if (name === 'history') renderHistory();
+  if (name === 'processes') renderProcesses();
+  if (name === 'remote') loadRemoteConfig();
+}
+
+function toast(msg) {
+  const t = document.getElementById('toast');
+  t.textContent = msg;
+  t.classList.add('show');
+  setTimeout(() => t.classList.remove('show'), 2000);
+}
+
+// Element with a class and plain-text content; command strings never go
+// through the HTML parser.
+function el(tag, cls, text) {
+  const node = document.createElement(tag);
+  if (cls) node.className = cls;
+  if (text != null) node.textContent = text;
+  return node;
+}
+
+// Run fn at once, then fold further calls within `wait` ms into one trailing
+// call, so a burst of failed mutations costs two re-fetches, not one each.
+function leadingDebounce(fn, wait) {
+  let timer = null, last = 0;
+  return () => {
+    const now = Date.now();
+    clearTimeout(timer);
+    if (now - last >= wait) {
+      last = now;
+      fn();
+    } else {
+      timer = setTimeout(() => { last = Date.now(); fn(); }, wait - (now - last));
+    }
+  };
+}
+
+function fmtDuration(ms) {
+  if (ms == null) return '';
+  return ms >= 1000 ? (ms / 1000).toFixed(1) + 's' : ms + 'ms';
+}
+
+// ---- Wizard: model cards ----
+(function() {
+  const list = document.getElementById('model-list');
+  const frag = document.createDocumentFragment();
+  MODELS.forEach((m, i) => {
+    const card = document.createElement('div');
+    card.className = 'model-card' + (i === 0 ? ' selected' : '');
+    card.onclick = () => {
+      selectedModel = i;
+      document.querySelectorAll('#model-list .model-card').forEach(c => c.classList.remove('selected'));
+      card.classList.add('selected');
+    };
+    const installed = m.installed ? '<span class="installed-tag">✓ installed</span>' : '';
+    card.innerHTML = `<div class="top"><span class="name">${m.name}${installed}</span><span class="badge badge-${m.quality}">${m.quality}</span></div>
+      <div class="meta">${m.size_gb} GB · ${m.params} params · min ${m.min_ram} RAM — ${m.description}</div>`;
+    frag.appendChild(card);
+  });
+  const skip = document.createElement('div');
+  skip.className = 'model-card';
+  skip.onclick = () => { selectedModel = -1; document.querySelectorAll('#model-list .model-card').forEach(c => c.classList.remove('selected')); skip.classList.add('selected'); };
+  skip.innerHTML = '<div class="name">Skip — no AI model (rule-based fallback only)</div><div class="meta">No download required</div>';
+  frag.appendChild(skip);
+  list.appendChild(frag);
+})();
+
+// ---- Wizard: install flow ----
+function startInstall() {
+  showStep(2);
+  fetch('/api/install', { method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify({ model_idx: selectedModel }) })
+    .then(r => r.json()).then(d => watchRun(d.run, renderProgress));
+}
+
+// One long-lived event stream per page.  It carries install/download state
+// whenever it changes, and simply being open is the server's heartbeat.
+let lastState = null;
+const stateListeners = new Set();
+new EventSource('/api/events').onmessage = e => {
+  lastState = JSON.parse(e.data);
+  stateListeners.forEach(fn => fn(lastState));
+};
+
+// Feed onState every state of install/download `run` until it ends.
+function watchRun(run, onState) {
+  const fn = s => {
+    if (s.run !== run) return;
+    onState(s);
+    if (s.done || s.error) stateListeners.delete(fn);
+  };
+  stateListeners.add(fn);
+  if (lastState) fn(lastState);
+}
+
+function renderProgress(s) {
+  document.getElementById('progress-fill').style.width = s.pct + '%';
+  document.getElementById('progress-pct').textContent = s.total_mb > 0 ? s.downloaded_mb.toFixed(0)+' / '+s.total_mb.toFixed(0)+' MB  ('+s.pct.toFixed(0)+'%)' : '';
+  document.getElementById('progress-speed').textContent = s.speed ? s.speed+'   '+s.eta : '';
+  if (s.status) document.getElementById('install-status').textContent = s.status;
+  if (s.title) document.getElementById('install-title').textContent = s.title;
+  const box = document.getElementById('log-box');
+  // s.logs starts at absolute line s.log_base; skip lines already shown.
+  const seen = +(box.dataset.seen || 0);
+  if (s.logs && s.log_base + s.logs.length > seen) {
+    // Append new lines in one go and scroll once (reading scrollHeight forces layout).
+    const frag = document.createDocumentFragment();
+    for (let i = Math.max(seen - s.log_base, 0); i < s.logs.length; i++) {
+      const div = document.createElement('div');
+      div.className = 'log-' + s.logs[i].level;
+      div.textContent = (s.logs[i].level==='ok'?'✓ ':s.logs[i].level==='err'?'✗ ':'  ') + s.logs[i].msg;
+      frag.appendChild(div);
+    }
+    box.appendChild(frag); box.scrollTop = box.scrollHeight;
+    box.dataset.seen = s.log_base + s.logs.length;
+  }
+  if (s.done) setTimeout(() => showFinish(s), 500);
+  if (s.error) { document.getElementById('install-title').textContent = 'Installation failed'; document.getElementById('install-status').textContent = s.error; }
+}
+
+function showFinish(s) {
+  const checks = document.getElementById('finish-checks');
+  checks.innerHTML = (s.checks || []).map(c =>
+    '<div class="check-item '+(c.ok?'check-ok':'check-warn')+'"><span class="icon">'+(c.ok?'✓':'○')+'</span> '+c.label+'</div>'
+  ).join('');
+  showStep(3);
+}
+
+// ---- Settings: Models ----
+function renderSettingsModels() {
+  fetch('/api/models').then(r => r.json()).then(paintSettingsModels);
+}
+
+function paintSettingsModels(models) {
+  const list = document.getElementById('settings-model-list');
+  const frag = document.createDocumentFragment();
+  models.forEach((m, i) => {
+    const card = document.createElement('div');
+    card.className = 'model-card';
+    const installed = m.installed ? '<span class="installed-tag">✓ installed</span>' : '';
+    const active = m.active ? '<span class="active-tag">● active</span>' : '';
+    let actionBtn = '';
+    if (m.active) {
+      actionBtn = '<button class="btn btn-secondary btn-sm" disabled>Active</button>';
+    } else if (m.installed) {
+      actionBtn = `<button class="btn btn-primary btn-sm" onclick="switchModel(${i})">Switch to this</button>`;
+    } else {
+      actionBtn = `<button class="btn btn-primary btn-sm" onclick="downloadAndSwitch(${i})">Download &amp; activate</button>`;
+    }
+    card.innerHTML = `<div class="top"><span class="name">${m.name}${installed}${active}</span><span class="badge badge-${m.quality}">${m.quality}</span></div>
+      <div class="meta">${m.size_gb} GB · ${m.params} params · min ${m.min_ram} RAM — ${m.description}</div>
+      <div style="margin-top:10px;text-align:right">${actionBtn}</div>`;
+    frag.appendChild(card);
+  });
+  list.replaceChildren(frag);
+}
+
+function switchModel(idx) {
+  fetch('/api/switch-model', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify({model_idx: idx}) })
+    .then(r => r.json()).then(d => {
+      if (d.ok) { toast('Switched to ' + d.name); renderSettingsModels(); }
+      else toast('Error: ' + d.error);
+    });
+}
+
+function downloadAndSwitch(idx) {
+  fetch('/api/download-model', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify({model_idx: idx}) })
+    .then(r => r.json()).then(d => {
+      toast('Downloading... this may take a few minutes');
+      watchRun(d.run, s => {
+        if (s.done) { toast('Download complete!'); renderSettingsModels(); }
+      });
+    });
+}
+
+// ---- Settings: Allow List ----
+function renderAllowList() {
+  fetch('/api/allowlist').then(r => r.json()).then(paintAllowList);
+}
+const refreshAllowList = leadingDebounce(renderAllowList, 150);
+
+function paintAllowList(data) {
+  allowedCmds = data;
+  const list = document.getElementById('user-allow-list');
+  const empty = document.getElementById('allow-empty');
+  const frag = document.createDocumentFragment();
+  empty.style.display = data.length === 0 ? 'block' : 'none';
+  data.forEach(cmd => {
+    const item = el('div', 'allow-item');
+    const remove = el('button', 'remove-btn', '✕');
+    remove.onclick = () => removeAllowed(cmd);
+    item.append(el('span', 'cmd', cmd), remove);
+    frag.appendChild(item);
+  });
+  list.replaceChildren(frag);
+}
+
+function addAllowedCmd() {
+  const input = document.getElementById('add-cmd-input');
+  const cmd = input.value.trim();
+  if (!cmd) return;
+  fetch('/api/allowlist/add', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify({command: cmd}) })
+    .then(r => r.json()).then(res => { input.value = ''; paintAllowList(res.list); toast('Added: ' + cmd); })
+    .catch(refreshAllowList);
+}
+
+function removeAllowed(cmd) {
+  fetch('/api/allowlist/remove', { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify({command: cmd}) })
+    .then(r => r.json()).then(res => { paintAllowList(res.list); toast('Removed: ' + cmd); })
+    .catch(refreshAllowList);
+}
+
+function renderSafeList() {
+  fetch('/api/safe-commands').then(r => r.json()).then(paintSafeList);
+}
+const refreshSafeList = leadingDebounce(renderSafeList, 150);
+
+function paintSafeList(data) {
+  safeCommands = data;
+  const list = document.getElementById('safe-list');
+  const frag = document.createDocumentFragment();
+  Object.entries(data).sort((a,b) => a[0].localeCompare(b[0])).forEach(([cmd, enabled]) => {
+    const chip = document.createElement('span');
+    chip.className = 'safe-chip ' + (enabled ? 'enabled' : 'disabled');
+    chip.textContent = cmd;
+    chip.onclick = () => toggleSafe(cmd, enabled);
+    frag.appendChild(chip);
+  });
+  list.replaceChildren(frag);
+}
+
+function toggleSafe(cmd, currentlyEnabled) {
+  const endpoint = currentlyEnabled ? '/api/safe-commands/disable' : '/api/safe-commands/enable';
+  fetch(endpoint, { method: 'POST', headers: {'Content-Type':'application/json'}, body: JSON.stringify({command: cmd}) })
+    .then(r => r.json()).then(res => {
+      paintSafeList(res.safe);
+      toast((currentlyEnabled ? 'Disabled: ' : 'Enabled: ') + cmd);
+    })
+    .catch(refreshSafeList);
+}
+
+// ---- Settings: Config ----
+function renderConfig() {
+  fetch('/api/config').then(r => r.json()).then(paintConfig);
+}
+
+function paintConfig(cfg) {
+  document.getElementById('config-display').textContent = Object.entries(cfg).map(([k,v]) => k + ' = ' + JSON.stringify(v)).join('\\n');
+}
+
+// ---- Remote AI ----
+let currentRemoteProvider = '';
+
+function loadRemoteConfig() {
+  fetch('/api/remote-config').then(r => r.json()).then(cfg => {
+    currentRemoteProvider = cfg.provider || '';
+    updateProviderButtons(currentRemoteProvider);
+    if (cfg.openai_api_key) document.getElementById('openai-key-input').value = cfg.openai_api_key;
+    if (cfg.claude_api_key) document.getElementById('claude-key-input').value = cfg.claude_api_key;
+    if (cfg.remote_model) {
+      const oSel = document.getElementById('openai-model-select');
+      const cSel = document.getElementById('claude-model-select');
+      if (currentRemoteProvider === 'openai') oSel.value = cfg.remote_model;
+      if (currentRemoteProvider === 'claude') cSel.value = cfg.remote_model;
+    }
+  }).catch(() => {});
+}
+
+function setRemoteProvider(provider) {
+  currentRemoteProvider = provider;
+  updateProviderButtons(provider);
+}
+
+function updateProviderButtons(provider) {
+  ['none', 'openai', 'claude'].forEach(p => {
+    const btn = document.getElementById('rp-' + p);
+    const val = p === 'none' ? '' : p;
+    btn.className = 'btn btn-sm ' + (val === provider ? 'btn-primary' : 'btn-secondary');
+  });
+  document.getElementById('remote-openai-cfg').style.display = provider === 'openai' ? 'block' : 'none';
+  document.getElementById('remote-claude-cfg').style.display = provider === 'claude' ? 'block' : 'none';
+  document.getElementById('remote-status').textContent = '';
+}
+
+function saveRemoteConfig() {
+  const data = {
+    provider: currentRemoteProvider,
+    openai_api_key: document.getElementById('openai-key-input').value.trim(),
+    claude_api_key: document.getElementById('claude-key-input').value.trim(),
+    remote_model: currentRemoteProvider === 'openai'
+      ? document.getElementById('openai-model-select').value
+      : currentRemoteProvider === 'claude'
+        ? document.getElementById('claude-model-select').value
+        : '',
+  };
+  fetch('/api/remote-config', {
+    method: 'POST',
+    headers: {'Content-Type':'application/json'},
+    body: JSON.stringify(data)
+  }).then(r => r.json()).then(res => {
+    if (res.ok) toast('Remote AI settings saved');
+    else toast('Error saving: ' + (res.error || 'unknown'));
+  });
+}
+
+function testRemoteConnection() {
+  const status = document.getElementById('remote-status');
+  status.textContent = 'Testing...';
+  status.style.color = 'var(--fg-dim)';
+  fetch('/api/remote-test', { method: 'POST' }).then(r => r.json()).then(res => {
+    status.textContent = res.ok ? '✓ ' + res.message : '✗ ' + res.message;
+    status.style.color = res.ok ? 'var(--green)' : 'var(--red)';
+  }).catch(() => {
+    status.textContent = '✗ Request failed';
+    status.style.color = 'var(--red)';
+  });
+}
+
+// ---- History ----
+let historyCache = null;
+async function loadHistory(limit) {
+  const r = await fetch('/api/history?limit=' + limit);
+  historyCache = await r.json();
+}
+async function renderHistory() {
+  const limit = document.getElementById('history-limit').value;
+  const filter = document.getElementById('history-filter').value;
+  await loadHistory(limit);
+  let items = historyCache || [];
+  if (filter === 'success') items = items.filter(e => e.success === true);
+  else if (filter === 'failed') items = items.filter(e => e.success === false);
+  else if (filter === 'with-prompt') items = items.filter(e => e.instruction);
+  const container = document.getElementById('history-list');
+  if (!items.length) {
+    container.replaceChildren(el('div', 'history-empty', 'No history entries found.'));
+    return;
+  }
+  const frag = document.createDocumentFragment();
+  items.slice().reverse().forEach(e => {
+    const item = el('div', 'history-item');
+    item.append(el('div', 'cmd', e.command || '?'));
+    if (e.instruction) item.append(el('div', 'instruction', 'Prompt: ' + e.instruction));
+    const statusCls = e.success === true ? 'status-ok' : (e.success === false ? 'status-fail' : '');
+    const statusTxt = e.success === true ? '✓' : (e.success === false ? '✗' : '?');
+    const meta = el('div', 'meta');
+    meta.append(
+      el('span', statusCls, statusTxt),
+      el('span', '', (e.timestamp || '').slice(0, 19).replace('T', ' ')),
+      el('span', '', e.cwd || ''),
+    );
+    item.append(meta);
+    frag.append(item);
+  });
+  container.replaceChildren(frag);
+}
+
+async function clearHistory() {
+  if (!confirm('Clear all prompt history? This cannot be undone.')) return;
+  await fetch('/api/history/clear', {method:'POST'});
+  toast('History cleared');
+  renderHistory();
+}
+
+// ---- Processes ----
+let processCache = null;
+async function loadProcesses(limit) {
+  const r = await fetch('/api/processes?limit=' + limit);
+  processCache = await r.json();
+}
+async function renderProcesses() {
+  const limit = document.getElementById('proc-limit').value;
+  const filter = document.getElementById('proc-filter').value;
+  await loadProcesses(limit);
+  let items = processCache || [];
+  if (filter !== 'all') items = items.filter(e => e.status === filter);
+  const container = document.getElementById('proc-list');
+  if (!items.length) {
+    container.replaceChildren(el('div', 'history-empty', 'No process history found.'));
+    return;
+  }
+  const STEP_ICONS = {
+    success: ['✓', 'var(--green)'], failed: ['✗', 'var(--red)'], skipped: ['⊘', 'var(--yellow)'],
+  };
+  const frag = document.createDocumentFragment();
+  items.slice().reverse().forEach(p => {
+    const steps = p.steps || [];
+    const succeeded = steps.filter(s => s.status === 'success').length;
+
+    const item = el('div', 'process-item');
+    const header = el('div', 'proc-header');
+    header.onclick = () => item.classList.toggle('expanded');
+    header.append(
+      el('span', 'proc-expand', '▸'),
+      el('span', 'proc-instruction', p.instruction || '?'),
+      el('span', 'proc-badge ' + (p.status || 'unknown'), p.status || '?'),
+    );
+    const meta = el('div', 'proc-meta');
+    const pid = el('span', '', p.id || '?');
+    pid.style.opacity = '.5';
+    meta.append(
+      el('span', '', (p.timestamp || '').slice(0, 19).replace('T', ' ')),
+      el('span', '', p.ai_provider || '?'),
+      el('span', '', succeeded + '/' + steps.length + ' steps'),
+      el('span', '', fmtDuration(p.total_duration_ms)),
+      pid,
+    );
+    const stepList = el('div', 'proc-steps');
+    steps.forEach(s => {
+      const [glyph, color] = STEP_ICONS[s.status] || ['?', 'var(--fg-dim)'];
+      const icon = el('span', '', glyph);
+      icon.style.color = color;
+      const step = el('div', 'proc-step');
+      step.append(icon, el('span', 'step-cmd', s.command || '?'));
+      if (s.description) step.append(el('span', 'step-desc', s.description));
+      step.append(el('span', 'step-dur', fmtDuration(s.duration_ms)));
+      stepList.append(step);
+    });
+    item.append(header, meta, stepList);
+    frag.append(item);
+  });
+  container.replaceChildren(frag);
+}
+async function clearProcesses() {
+  if (!confirm('Clear all process history? This cannot be undone.')) return;
+  await fetch('/api/processes/clear', {method:'POST'});
+  toast('Process history cleared');
+  renderProcesses();
+}
+
+// ---- Add-input enter key ----
+document.addEventListener('keydown', e => {
+  if (e.key === 'Enter' && document.activeElement && document.activeElement.id === 'add-cmd-input') addAllowedCmd();
+});
+"""
+
+
+def _minify_js(js: str) -> str:
+    # Only indentation, blank lines and whole-line comments: collapsing
+    # newlines would break automatic semicolon insertion.
+    js = re.sub(r"^[ \t]*//[^\n]*\n", "", js, flags=re.M)
+    return re.sub(r"^\s+", "", js, flags=re.M)
+
+
+# Static assets live at content-addressed URLs, so browsers may cache them
+# forever.  path -> (content type, raw bytes, gzipped bytes)
+_STATIC: dict[str, tuple[str, bytes, bytes]] = {}
+
+
+def _add_static(name: str, ext: str, ctype: str, data: bytes) -> str:
+    path = f"/static/{name}.{zlib.crc32(data):08x}.{ext}"
+    _STATIC[path] = (ctype, data, gzip.compress(data, 9))
+    return path
+
+
+_CSS_PATH = _add_static("app", "css", "text/css", _minify_css(_CSS).encode())
+_JS_PATH = _add_static("app", "js", "text/javascript", _minify_js(_JS).encode())
+
+
 # -- HTML builder: wizard + settings ------------------------------------------
 
 def _build_html(mode: str = "auto") -> str:
-    models_json = json.dumps(_models_state())
-    allowed_json = json.dumps(sorted(get_permanent_list()))
-    safe_json = json.dumps(get_safe_commands())
-    current_model = _get_current_model()
-    show_settings = "true" if mode == "settings" else ("true" if (mode == "auto" and _is_installed()) else "false")
+    models_json = _models_json().decode()
+    allowed_json = _allowlist_json().decode()
+    safe_json = _safe_commands_json().decode()
+    show_settings = mode == "settings" or (mode == "auto" and _is_installed())
+    boot_json = (
+        f'{{"models": {models_json}, "allowedCmds": {allowed_json}, '
+        f'"safeCommands": {safe_json}, "showSettings": {json.dumps(show_settings)}}}'
+    ).replace("</", "<\\/")  # never let data close the <script> element
 
     return f"""<!DOCTYPE html>
 <html lang="en">
@@ -289,7 +952,7 @@ def _build_html(mode: str = "auto") -> str:
 <meta charset="utf-8">
 <meta name="viewport" content="width=device-width, initial-scale=1">
 <title>termai</title>
-<style>{_CSS}</style>
+<link rel="stylesheet" href="{_CSS_PATH}">
 </head>
 <body>
 
@@ -351,7 +1014,7 @@ def _build_html(mode: str = "auto") -> str:
     </div>
     <div class="btn-row">
       <button class="btn btn-secondary" onclick="openSettings()">Settings</button>
-      <button class="btn btn-primary" onclick="fetch('/api/shutdown');window.close();">Close</button>
+      <button class="btn btn-primary" onclick="navigator.sendBeacon('/api/shutdown');window.close();">Close</button>
     </div>
   </div>
 </div>
@@ -360,7 +1023,7 @@ def _build_html(mode: str = "auto") -> str:
 <div class="dashboard" id="settings-view" style="display:none">
   <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:8px">
     <h1>termai settings</h1>
-    <button class="btn btn-secondary btn-sm" onclick="fetch('/api/shutdown');window.close();">Close</button>
+    <button class="btn btn-secondary btn-sm" onclick="navigator.sendBeacon('/api/shutdown');window.close();">Close</button>
   </div>
   <div class="subtitle">Manage your AI model, allow list, prompt history, and configuration.</div>
 
@@ -510,436 +1173,89 @@ def _build_html(mode: str = "auto") -> str:
 
 <div class="toast" id="toast"></div>
 
-<script>
-const MODELS = {models_json};
-const CURRENT_MODEL = "{current_model}";
-let allowedCmds = {allowed_json};
-let safeCommands = {safe_json};
-let selectedModel = 0;
-let pollTimer = null;
-const showSettings = {show_settings};
-
-// Init: show wizard or settings
-if (showSettings) openSettings();
-
-function showStep(n) {{
-  document.querySelectorAll('.step').forEach(s => s.classList.remove('active'));
-  document.getElementById('step-' + n).classList.add('active');
-}}
-
-function openSettings() {{
-  document.getElementById('wizard-view').style.display = 'none';
-  document.getElementById('settings-view').style.display = 'block';
-  renderSettingsModels();
-  renderAllowList();
-  renderSafeList();
-  renderConfig();
-}}
-
-function switchTab(name, btn) {{
-  document.querySelectorAll('.tab-content').forEach(t => t.classList.remove('active'));
-  document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
-  document.getElementById('tab-' + name).classList.add('active');
-  btn.classList.add('active');
-  if (name === 'history') renderHistory();
-  if (name === 'processes') renderProcesses();
-  if (name === 'remote') loadRemoteConfig();
-}}
-
-function toast(msg) {{
-  const t = document.getElementById('toast');
-  t.textContent = msg;
-  t.classList.add('show');
-  setTimeout(() => t.classList.remove('show'), 2000);
-}}
-
-// ---- Wizard: model cards ----
-(function() {{
-  const list = document.getElementById('model-list');
-  MODELS.forEach((m, i) => {{
-    const card = document.createElement('div');
-    card.className = 'model-card' + (i === 0 ? ' selected' : '');
-    card.onclick = () => {{
-      selectedModel = i;
-      document.querySelectorAll('#model-list .model-card').forEach(c => c.classList.remove('selected'));
-      card.classList.add('selected');
-    }};
-    const installed = m.installed ? '<span class="installed-tag">✓ installed</span>' : '';
-    card.innerHTML = `<div class="top"><span class="name">${{m.name}}${{installed}}</span><span class="badge badge-${{m.quality}}">${{m.quality}}</span></div>
-      <div class="meta">${{m.size_gb}} GB · ${{m.params}} params · min ${{m.min_ram}} RAM — ${{m.description}}</div>`;
-    list.appendChild(card);
-  }});
-  const skip = document.createElement('div');
-  skip.className = 'model-card';
-  skip.onclick = () => {{ selectedModel = -1; document.querySelectorAll('#model-list .model-card').forEach(c => c.classList.remove('selected')); skip.classList.add('selected'); }};
-  skip.innerHTML = '<div class="name">Skip — no AI model (rule-based fallback only)</div><div class="meta">No download required</div>';
-  list.appendChild(skip);
-}})();
-
-// ---- Wizard: install flow ----
-function startInstall() {{
-  showStep(2);
-  fetch('/api/install', {{ method: 'POST', headers: {{'Content-Type': 'application/json'}}, body: JSON.stringify({{ model_idx: selectedModel }}) }});
-  pollTimer = setInterval(pollProgress, 1000);
-}}
-
-function pollProgress() {{
-  fetch('/api/progress').then(r => r.json()).then(s => {{
-    document.getElementById('progress-fill').style.width = s.pct + '%';
-    document.getElementById('progress-pct').textContent = s.total_mb > 0 ? s.downloaded_mb.toFixed(0)+' / '+s.total_mb.toFixed(0)+' MB  ('+s.pct.toFixed(0)+'%)' : '';
-    document.getElementById('progress-speed').textContent = s.speed ? s.speed+'   '+s.eta : '';
-    if (s.status) document.getElementById('install-status').textContent = s.status;
-    if (s.title) document.getElementById('install-title').textContent = s.title;
-    const box = document.getElementById('log-box');
-    if (s.logs && s.logs.length > box.children.length) {{
-      for (let i = box.children.length; i < s.logs.length; i++) {{
-        const div = document.createElement('div');
-        div.className = 'log-' + s.logs[i].level;
-        div.textContent = (s.logs[i].level==='ok'?'✓ ':s.logs[i].level==='err'?'✗ ':'  ') + s.logs[i].msg;
-        box.appendChild(div); box.scrollTop = box.scrollHeight;
-      }}
-    }}
-    if (s.done) {{ clearInterval(pollTimer); setTimeout(() => showFinish(s), 500); }}
-    if (s.error) {{ clearInterval(pollTimer); document.getElementById('install-title').textContent = 'Installation failed'; document.getElementById('install-status').textContent = s.error; }}
-  }}).catch(() => {{}});
-}}
-
-function showFinish(s) {{
-  const checks = document.getElementById('finish-checks');
-  checks.innerHTML = '';
-  (s.checks || []).forEach(c => {{
-    checks.innerHTML += '<div class="check-item '+(c.ok?'check-ok':'check-warn')+'"><span class="icon">'+(c.ok?'✓':'○')+'</span> '+c.label+'</div>';
-  }});
-  showStep(3);
-}}
-
-// ---- Settings: Models ----
-function renderSettingsModels() {{
-  fetch('/api/models').then(r => r.json()).then(models => {{
-    const list = document.getElementById('settings-model-list');
-    list.innerHTML = '';
-    models.forEach((m, i) => {{
-      const card = document.createElement('div');
-      card.className = 'model-card';
-      const installed = m.installed ? '<span class="installed-tag">✓ installed</span>' : '';
-      const active = m.active ? '<span class="active-tag">● active</span>' : '';
-      let actionBtn = '';
-      if (m.active) {{
-        actionBtn = '<button class="btn btn-secondary btn-sm" disabled>Active</button>';
-      }} else if (m.installed) {{
-        actionBtn = `<button class="btn btn-primary btn-sm" onclick="switchModel(${{i}})">Switch to this</button>`;
-      }} else {{
-        actionBtn = `<button class="btn btn-primary btn-sm" onclick="downloadAndSwitch(${{i}})">Download &amp; activate</button>`;
-      }}
-      card.innerHTML = `<div class="top"><span class="name">${{m.name}}${{installed}}${{active}}</span><span class="badge badge-${{m.quality}}">${{m.quality}}</span></div>
-        <div class="meta">${{m.size_gb}} GB · ${{m.params}} params · min ${{m.min_ram}} RAM — ${{m.description}}</div>
-        <div style="margin-top:10px;text-align:right">${{actionBtn}}</div>`;
-      list.appendChild(card);
-    }});
-  }});
-}}
-
-function switchModel(idx) {{
-  fetch('/api/switch-model', {{ method: 'POST', headers: {{'Content-Type':'application/json'}}, body: JSON.stringify({{model_idx: idx}}) }})
-    .then(r => r.json()).then(d => {{
-      if (d.ok) {{ toast('Switched to ' + d.name); renderSettingsModels(); }}
-      else toast('Error: ' + d.error);
-    }});
-}}
-
-function downloadAndSwitch(idx) {{
-  fetch('/api/download-model', {{ method: 'POST', headers: {{'Content-Type':'application/json'}}, body: JSON.stringify({{model_idx: idx}}) }})
-    .then(() => {{
-      toast('Downloading... this may take a few minutes');
-      const poll = setInterval(() => {{
-        fetch('/api/progress').then(r => r.json()).then(s => {{
-          if (s.done) {{ clearInterval(poll); toast('Download complete!'); renderSettingsModels(); }}
-        }});
-      }}, 2000);
-    }});
-}}
-
-// ---- Settings: Allow List ----
-function renderAllowList() {{
-  fetch('/api/allowlist').then(r => r.json()).then(data => {{
-    allowedCmds = data;
-    const list = document.getElementById('user-allow-list');
-    const empty = document.getElementById('allow-empty');
-    list.innerHTML = '';
-    if (data.length === 0) {{ empty.style.display = 'block'; return; }}
-    empty.style.display = 'none';
-    data.forEach(cmd => {{
-      const item = document.createElement('div');
-      item.className = 'allow-item';
-      item.innerHTML = `<span class="cmd">${{cmd}}</span><button class="remove-btn" onclick="removeAllowed('${{cmd.replace(/'/g, "\\\\'")}}')">✕</button>`;
-      list.appendChild(item);
-    }});
-  }});
-}}
-
-function addAllowedCmd() {{
-  const input = document.getElementById('add-cmd-input');
-  const cmd = input.value.trim();
-  if (!cmd) return;
-  fetch('/api/allowlist/add', {{ method: 'POST', headers: {{'Content-Type':'application/json'}}, body: JSON.stringify({{command: cmd}}) }})
-    .then(r => r.json()).then(() => {{ input.value = ''; renderAllowList(); toast('Added: ' + cmd); }});
-}}
-
-function removeAllowed(cmd) {{
-  fetch('/api/allowlist/remove', {{ method: 'POST', headers: {{'Content-Type':'application/json'}}, body: JSON.stringify({{command: cmd}}) }})
-    .then(r => r.json()).then(() => {{ renderAllowList(); toast('Removed: ' + cmd); }});
-}}
-
-function renderSafeList() {{
-  fetch('/api/safe-commands').then(r => r.json()).then(data => {{
-    safeCommands = data;
-    const list = document.getElementById('safe-list');
-    list.innerHTML = '';
-    Object.entries(data).sort((a,b) => a[0].localeCompare(b[0])).forEach(([cmd, enabled]) => {{
-      const chip = document.createElement('span');
-      chip.className = 'safe-chip ' + (enabled ? 'enabled' : 'disabled');
-      chip.textContent = cmd;
-      chip.onclick = () => toggleSafe(cmd, enabled);
-      list.appendChild(chip);
-    }});
-  }});
-}}
-
-function toggleSafe(cmd, currentlyEnabled) {{
-  const endpoint = currentlyEnabled ? '/api/safe-commands/disable' : '/api/safe-commands/enable';
-  fetch(endpoint, {{ method: 'POST', headers: {{'Content-Type':'application/json'}}, body: JSON.stringify({{command: cmd}}) }})
-    .then(r => r.json()).then(() => {{
-      toast((currentlyEnabled ? 'Disabled: ' : 'Enabled: ') + cmd);
-      renderSafeList();
-    }});
-}}
-
-// ---- Settings: Config ----
-function renderConfig() {{
-  fetch('/api/config').then(r => r.json()).then(cfg => {{
-    document.getElementById('config-display').textContent = Object.entries(cfg).map(([k,v]) => k + ' = ' + JSON.stringify(v)).join('\\n');
-  }});
-}}
-
-// ---- Remote AI ----
-let currentRemoteProvider = '';
-
-function loadRemoteConfig() {{
-  fetch('/api/remote-config').then(r => r.json()).then(cfg => {{
-    currentRemoteProvider = cfg.provider || '';
-    updateProviderButtons(currentRemoteProvider);
-    if (cfg.openai_api_key) document.getElementById('openai-key-input').value = cfg.openai_api_key;
-    if (cfg.claude_api_key) document.getElementById('claude-key-input').value = cfg.claude_api_key;
-    if (cfg.remote_model) {{
-      const oSel = document.getElementById('openai-model-select');
-      const cSel = document.getElementById('claude-model-select');
-      if (currentRemoteProvider === 'openai') oSel.value = cfg.remote_model;
-      if (currentRemoteProvider === 'claude') cSel.value = cfg.remote_model;
-    }}
-  }}).catch(() => {{}});
-}}
-
-function setRemoteProvider(provider) {{
-  currentRemoteProvider = provider;
-  updateProviderButtons(provider);
-}}
-
-function updateProviderButtons(provider) {{
-  ['none', 'openai', 'claude'].forEach(p => {{
-    const btn = document.getElementById('rp-' + p);
-    const val = p === 'none' ? '' : p;
-    btn.className = 'btn btn-sm ' + (val === provider ? 'btn-primary' : 'btn-secondary');
-  }});
-  document.getElementById('remote-openai-cfg').style.display = provider === 'openai' ? 'block' : 'none';
-  document.getElementById('remote-claude-cfg').style.display = provider === 'claude' ? 'block' : 'none';
-  document.getElementById('remote-status').textContent = '';
-}}
-
-function saveRemoteConfig() {{
-  const data = {{
-    provider: currentRemoteProvider,
-    openai_api_key: document.getElementById('openai-key-input').value.trim(),
-    claude_api_key: document.getElementById('claude-key-input').value.trim(),
-    remote_model: currentRemoteProvider === 'openai'
-      ? document.getElementById('openai-model-select').value
-      : currentRemoteProvider === 'claude'
-        ? document.getElementById('claude-model-select').value
-        : '',
-  }};
-  fetch('/api/remote-config', {{
-    method: 'POST',
-    headers: {{'Content-Type':'application/json'}},
-    body: JSON.stringify(data)
-  }}).then(r => r.json()).then(res => {{
-    if (res.ok) toast('Remote AI settings saved');
-    else toast('Error saving: ' + (res.error || 'unknown'));
-  }});
-}}
-
-function testRemoteConnection() {{
-  const status = document.getElementById('remote-status');
-  status.textContent = 'Testing...';
-  status.style.color = 'var(--fg-dim)';
-  fetch('/api/remote-test', {{ method: 'POST' }}).then(r => r.json()).then(res => {{
-    status.textContent = res.ok ? '✓ ' + res.message : '✗ ' + res.message;
-    status.style.color = res.ok ? 'var(--green)' : 'var(--red)';
-  }}).catch(() => {{
-    status.textContent = '✗ Request failed';
-    status.style.color = 'var(--red)';
-  }});
-}}
+<script>window.__TERMAI__ = {boot_json};</script>
+<script src="{_JS_PATH}"></script>
+</body>
+</html>"""
 
-// ---- History ----
-let historyCache = null;
-async function loadHistory(limit) {{
-  const r = await fetch('/api/history?limit=' + limit);
-  historyCache = await r.json();
-}}
-async function renderHistory() {{
-  const limit = document.getElementById('history-limit').value;
-  const filter = document.getElementById('history-filter').value;
-  await loadHistory(limit);
-  let items = historyCache || [];
-  if (filter === 'success') items = items.filter(e => e.success === true);
-  else if (filter === 'failed') items = items.filter(e => e.success === false);
-  else if (filter === 'with-prompt') items = items.filter(e => e.instruction);
-  const container = document.getElementById('history-list');
-  if (!items.length) {{
-    container.innerHTML = '<div class="history-empty">No history entries found.</div>';
-    return;
-  }}
-  container.innerHTML = items.slice().reverse().map(e => {{
-    const ts = (e.timestamp || '').slice(0, 19).replace('T', ' ');
-    const statusCls = e.success === true ? 'status-ok' : (e.success === false ? 'status-fail' : '');
-    const statusTxt = e.success === true ? '✓' : (e.success === false ? '✗' : '?');
-    return `<div class="history-item">
-      <div class="cmd">${{e.command || '?'}}</div>
-      ${{e.instruction ? `<div class="instruction">Prompt: ${{e.instruction}}</div>` : ''}}
-      <div class="meta">
-        <span class="${{statusCls}}">${{statusTxt}}</span>
-        <span>${{ts}}</span>
-        <span>${{e.cwd || ''}}</span>
-      </div>
-    </div>`;
-  }}).join('');
-}}
 
-async function clearHistory() {{
-  if (!confirm('Clear all prompt history? This cannot be undone.')) return;
-  await fetch('/api/history/clear', {{method:'POST'}});
-  toast('History cleared');
-  renderHistory();
-}}
+# -- HTTP server + API -------------------------------------------------------
 
-// ---- Processes ----
-let processCache = null;
-async function loadProcesses(limit) {{
-  const r = await fetch('/api/processes?limit=' + limit);
-  processCache = await r.json();
-}}
-async function renderProcesses() {{
-  const limit = document.getElementById('proc-limit').value;
-  const filter = document.getElementById('proc-filter').value;
-  await loadProcesses(limit);
-  let items = processCache || [];
-  if (filter !== 'all') items = items.filter(e => e.status === filter);
-  const container = document.getElementById('proc-list');
-  if (!items.length) {{
-    container.innerHTML = '<div class="history-empty">No process history found.</div>';
-    return;
-  }}
-  container.innerHTML = items.slice().reverse().map((p, idx) => {{
-    const ts = (p.timestamp || '').slice(0, 19).replace('T', ' ');
-    const steps = p.steps || [];
-    const succeeded = steps.filter(s => s.status === 'success').length;
-    const total = steps.length;
-    const dur = p.total_duration_ms != null
-      ? (p.total_duration_ms >= 1000 ? (p.total_duration_ms/1000).toFixed(1) + 's' : p.total_duration_ms + 'ms')
-      : '';
-    const badgeCls = p.status || 'unknown';
-    const statusLabel = p.status || '?';
-    const ai = p.ai_provider || '?';
-    const pid = p.id || '?';
-
-    const stepsHtml = steps.map(s => {{
-      const sIcon = s.status === 'success' ? '<span style="color:var(--green)">✓</span>'
-        : s.status === 'failed' ? '<span style="color:var(--red)">✗</span>'
-        : s.status === 'skipped' ? '<span style="color:var(--yellow)">⊘</span>'
-        : '<span style="color:var(--fg-dim)">?</span>';
-      const sDur = s.duration_ms != null
-        ? (s.duration_ms >= 1000 ? (s.duration_ms/1000).toFixed(1) + 's' : s.duration_ms + 'ms')
-        : '';
-      return `<div class="proc-step">
-        ${{sIcon}}
-        <span class="step-cmd">${{s.command || '?'}}</span>
-        ${{s.description ? `<span class="step-desc">${{s.description}}</span>` : ''}}
-        <span class="step-dur">${{sDur}}</span>
-      </div>`;
-    }}).join('');
-
-    return `<div class="process-item" id="proc-${{idx}}">
-      <div class="proc-header" onclick="document.getElementById('proc-${{idx}}').classList.toggle('expanded')">
-        <span class="proc-expand">▸</span>
-        <span class="proc-instruction">${{p.instruction || '?'}}</span>
-        <span class="proc-badge ${{badgeCls}}">${{statusLabel}}</span>
-      </div>
-      <div class="proc-meta">
-        <span>${{ts}}</span>
-        <span>${{ai}}</span>
-        <span>${{succeeded}}/${{total}} steps</span>
-        <span>${{dur}}</span>
-        <span style="opacity:.5">${{pid}}</span>
-      </div>
-      <div class="proc-steps">${{stepsHtml}}</div>
-    </div>`;
-  }}).join('');
-}}
-async function clearProcesses() {{
-  if (!confirm('Clear all process history? This cannot be undone.')) return;
-  await fetch('/api/processes/clear', {{method:'POST'}});
-  toast('Process history cleared');
-  renderProcesses();
-}}
+def _config_json() -> bytes:
+    cfg = get_config()
+    return _dumps({
+        "model": cfg.model, "device": cfg.device,
+        "max_tokens": cfg.max_tokens, "temperature": cfg.temperature,
+        "remote_provider": cfg.remote_provider,
+        "remote_model": cfg.remote_model,
+        "config_file": str(CONFIG_FILE),
+    })
 
-// ---- Add-input enter key ----
-document.addEventListener('keydown', e => {{
-  if (e.key === 'Enter' && document.activeElement && document.activeElement.id === 'add-cmd-input') addAllowedCmd();
-}});
 
-// Heartbeat (watchdog detects disconnection; no automatic shutdown on refresh)
-setInterval(() => fetch('/api/heartbeat').catch(() => {{}}), 2000);
-</script>
-</body>
-</html>"""
+# Payloads that /api/state can combine into one response.
+_STATE_PARTS = {
+    "progress": _state_json,
+    "models": _models_json,
+    "allowlist": _allowlist_json,
+    "safe": _safe_commands_json,
+    "config": _config_json,
+}
 
+_SSE_PING = 5.0
+# How long the server stays up with no page connected before exiting.
+_DISCONNECT_GRACE = 40.0
+_SSE_MIN_INTERVAL = 0.25
+_CACHE_FOREVER = "public, max-age=31536000, immutable"
 
-# -- HTTP server + API -------------------------------------------------------
 
 class _WizardHandler(BaseHTTPRequestHandler):
-    html_page: str = ""
+    # Keep-alive: the page's fetches reuse one connection instead of opening
+    # one per request.  Every response with a body carries Content-Length;
+    # the open-ended event stream says Connection: close instead.
+    protocol_version = "HTTP/1.1"
+    # SSE events are small separate writes; don't let Nagle hold them back.
+    disable_nagle_algorithm = True
+    html_page: bytes = b""
     server_ref: HTTPServer | None = None
     last_heartbeat: float = 0.0
 
     def do_GET(self) -> None:
         if self.path == "/":
-            self._respond(200, "text/html", self.html_page.encode())
+            self._respond_tagged("text/html; charset=utf-8", self.html_page)
+        elif self.path in _STATIC:
+            ctype, raw, gz = _STATIC[self.path]
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                self._respond(200, ctype, gz, cache=_CACHE_FOREVER, encoding="gzip")
+            else:
+                self._respond(200, ctype, raw, cache=_CACHE_FOREVER)
+        elif self.path.startswith("/api/progress?"):
+            qs = parse_qs(urlparse(self.path).query)
+            since = int(qs.get("since", ["0"])[0])
+            self._respond(200, "application/json", _state_json(since))
         elif self.path == "/api/progress":
-            self._respond(200, "application/json", json.dumps(_download_state).encode())
+            self._respond(200, "application/json", _state_json())
+        elif self.path == "/api/events":
+            self._stream_events()
         elif self.path == "/api/heartbeat":
-            _WizardHandler.last_heartbeat = time.monotonic()
+            with _heartbeat:
+                type(self).last_heartbeat = time.monotonic()
+                _heartbeat.notify_all()
             self._respond(200, "text/plain", b"ok")
         elif self.path == "/api/models":
-            self._respond(200, "application/json", json.dumps(_models_state()).encode())
+            self._respond_json(_models_json())
         elif self.path == "/api/allowlist":
-            self._respond(200, "application/json", json.dumps(sorted(get_permanent_list())).encode())
+            self._respond_json(_allowlist_json())
         elif self.path == "/api/config":
-            cfg = get_config()
-            data = {"model": cfg.model, "device": cfg.device,
-                    "max_tokens": cfg.max_tokens, "temperature": cfg.temperature,
-                    "remote_provider": cfg.remote_provider,
-                    "remote_model": cfg.remote_model,
-                    "config_file": str(CONFIG_FILE)}
-            self._respond(200, "application/json", json.dumps(data).encode())
+            self._respond_json(_config_json())
+        elif self.path.startswith("/api/state"):
+            qs = parse_qs(urlparse(self.path).query)
+            parts = qs.get("parts", [""])[0].split(",")
+            # Splice the parts' cached JSON bytes instead of re-serializing them.
+            body = b",".join(
+                b'"' + name.encode() + b'":' + _STATE_PARTS[name]()
+                for name in dict.fromkeys(parts) if name in _STATE_PARTS
+            )
+            self._respond_json(b"{" + body + b"}")
         elif self.path == "/api/remote-config":
             cfg = get_config()
             masked_openai = _mask_key(cfg.openai_api_key)
@@ -952,23 +1268,19 @@ class _WizardHandler(BaseHTTPRequestHandler):
                 "has_openai_key": bool(cfg.openai_api_key),
                 "has_claude_key": bool(cfg.claude_api_key),
             }
-            self._respond(200, "application/json", json.dumps(data).encode())
+            self._respond_json(_dumps(data))
         elif self.path.startswith("/api/history"):
-            from urllib.parse import urlparse, parse_qs
             qs = parse_qs(urlparse(self.path).query)
             limit = int(qs.get("limit", ["50"])[0])
-            from termai.logger import read_history
             entries = read_history(limit)
-            self._respond(200, "application/json", json.dumps(entries).encode())
+            self._respond_json(_dumps(entries))
         elif self.path.startswith("/api/processes"):
-            from urllib.parse import urlparse, parse_qs
             qs = parse_qs(urlparse(self.path).query)
             limit = int(qs.get("limit", ["20"])[0])
-            from termai.process_log import read_processes
             entries = read_processes(limit)
-            self._respond(200, "application/json", json.dumps(entries).encode())
+            self._respond_json(_dumps(entries))
         elif self.path == "/api/safe-commands":
-            self._respond(200, "application/json", json.dumps(get_safe_commands()).encode())
+            self._respond_json(_safe_commands_json())
         elif self.path == "/api/shutdown":
             self._respond(200, "text/plain", b"bye")
             threading.Thread(target=self._shutdown, daemon=True).start()
@@ -980,58 +1292,62 @@ class _WizardHandler(BaseHTTPRequestHandler):
 
         if self.path == "/api/install":
             model_idx = body.get("model_idx", -1)
-            self._respond(200, "application/json", b'{"ok":true}')
-            threading.Thread(target=_run_install, args=(model_idx,), daemon=True).start()
+            # Reset done/error/log synchronously so no stale state is tagged with this run.
+            run = _begin_run()
+            self._respond(200, "application/json", _dumps({"ok": True, "run": run}))
+            threading.Thread(target=_guarded_run, args=(_run_install, model_idx), daemon=True).start()
 
         elif self.path == "/api/switch-model":
             idx = body.get("model_idx", -1)
             if 0 <= idx < len(CATALOG):
                 m = CATALOG[idx]
                 if (MODEL_DIR / m.filename).exists():
-                    from termai.models import _save_model_choice
-                    _save_model_choice(m.filename)
+                    _save_model_choice_impl(m.filename)
                     # Reset cached config
-                    import termai.config as _cfg
                     _cfg._config = None
+                    _invalidate_models_state()
                     self._respond(200, "application/json",
-                                  json.dumps({"ok": True, "name": m.name}).encode())
+                                  _dumps({"ok": True, "name": m.name}))
                 else:
                     self._respond(200, "application/json",
-                                  json.dumps({"ok": False, "error": "Model not downloaded"}).encode())
+                                  _dumps({"ok": False, "error": "Model not downloaded"}))
             else:
                 self._respond(400, "application/json", b'{"ok":false,"error":"Invalid index"}')
 
         elif self.path == "/api/download-model":
             idx = body.get("model_idx", -1)
             if 0 <= idx < len(CATALOG):
-                self._respond(200, "application/json", b'{"ok":true}')
-                threading.Thread(target=_download_and_switch, args=(idx,), daemon=True).start()
+                run = _begin_run()
+                self._respond(200, "application/json", _dumps({"ok": True, "run": run}))
+                threading.Thread(target=_guarded_run, args=(_download_and_switch, idx), daemon=True).start()
             else:
                 self._respond(400, "application/json", b'{"ok":false}')
 
+        # Allow-list mutations answer with the updated list, so the page
+        # repaints from the response instead of fetching it again.
         elif self.path == "/api/allowlist/add":
             cmd = body.get("command", "")
             if cmd:
                 add_to_permanent(cmd)
-            self._respond(200, "application/json", b'{"ok":true}')
+            self._respond(200, "application/json", b'{"ok":true,"list":' + _allowlist_json() + b"}")
 
         elif self.path == "/api/allowlist/remove":
             cmd = body.get("command", "")
             if cmd:
                 remove_from_permanent(cmd)
-            self._respond(200, "application/json", b'{"ok":true}')
+            self._respond(200, "application/json", b'{"ok":true,"list":' + _allowlist_json() + b"}")
 
         elif self.path == "/api/safe-commands/disable":
             cmd = body.get("command", "")
             if cmd:
                 disable_safe_command(cmd)
-            self._respond(200, "application/json", b'{"ok":true}')
+            self._respond(200, "application/json", b'{"ok":true,"safe":' + _safe_commands_json() + b"}")
 
         elif self.path == "/api/safe-commands/enable":
             cmd = body.get("command", "")
             if cmd:
                 enable_safe_command(cmd)
-            self._respond(200, "application/json", b'{"ok":true}')
+            self._respond(200, "application/json", b'{"ok":true,"safe":' + _safe_commands_json() + b"}")
 
         elif self.path == "/api/remote-config":
             _save_remote_config(body)
@@ -1040,10 +1356,9 @@ class _WizardHandler(BaseHTTPRequestHandler):
         elif self.path == "/api/remote-test":
             ok, msg = _test_remote_connection()
             self._respond(200, "application/json",
-                          json.dumps({"ok": ok, "message": msg}).encode())
+                          _dumps({"ok": ok, "message": msg}))
 
         elif self.path == "/api/history/clear":
-            from termai.logger import LOG_FILE
             try:
                 LOG_FILE.write_text("")
             except OSError:
@@ -1051,12 +1366,12 @@ class _WizardHandler(BaseHTTPRequestHandler):
             self._respond(200, "application/json", b'{"ok":true}')
 
         elif self.path == "/api/processes/clear":
-            from termai.process_log import clear_processes
             clear_processes()
             self._respond(200, "application/json", b'{"ok":true}')
 
         elif self.path == "/api/shutdown":
-            self._respond(200, "text/plain", b"bye")
+            # Sent with navigator.sendBeacon, which outlives window.close().
+            self._respond(204, "text/plain", b"")
             threading.Thread(target=self._shutdown, daemon=True).start()
 
         else:
@@ -1068,16 +1383,97 @@ class _WizardHandler(BaseHTTPRequestHandler):
             return json.loads(self.rfile.read(length))
         return {}
 
-    def _respond(self, code: int, ctype: str, body: bytes) -> None:
+    def _respond_json(self, body: bytes) -> None:
+        self._respond_tagged("application/json", body)
+
+    def _respond_tagged(self, ctype: str, body: bytes) -> None:
+        """200 with an ETag, or 304 when the browser already has this body."""
+        etag = f'"{zlib.crc32(body):08x}-{len(body):x}"'
+        if etag in (t.strip() for t in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self._end_headers_with(body)
+
+    def _respond(self, code: int, ctype: str, body: bytes, *,
+                 cache: str = "no-cache", encoding: str = "") -> None:
         self.send_response(code)
         self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+            self.send_header("Vary", "Accept-Encoding")
+        self._end_headers_with(body)
+
+    def _end_headers_with(self, body: bytes) -> None:
+        """end_headers() and the body as a single write on the socket.
+
+        send_header() only buffers; appending the body to that buffer lets the
+        response leave in one send (one segment for small pages) instead of a
+        header packet followed by a body packet.
+        """
+        if self.request_version == "HTTP/0.9":
+            self.wfile.write(body)
+            return
+        self._headers_buffer.append(b"\r\n")
+        self._headers_buffer.append(body)
+        self.flush_headers()
+
+    def _stream_events(self) -> None:
+        """Server-Sent Events: push _download_state whenever it changes.
+
+        The open stream is also the page's heartbeat: it is counted in
+        _open_streams until a closed tab makes a write fail, and the watchdog
+        only starts its countdown once no stream is left.  Each event carries
+        only the log lines this stream hasn't sent yet.
+        """
+        global _open_streams
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
         self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
         self.end_headers()
-        self.wfile.write(body)
+        seen = -1
+        logs_sent = 0
+        with _heartbeat:
+            _open_streams += 1
+            _heartbeat.notify_all()
+        try:
+            while True:
+                with _state_changed:
+                    _state_changed.wait_for(lambda: _state_version != seen, timeout=_SSE_PING)
+                    if _state_version == seen:
+                        payload = None
+                    else:
+                        seen = _state_version
+                        payload = _state_snapshot_locked(logs_sent)
+                        logs_sent = _logs_total
+                self.wfile.write(b": ping\n\n" if payload is None else b"data: " + _dumps(payload) + b"\n\n")
+                self.wfile.flush()
+                if payload is not None:
+                    time.sleep(_SSE_MIN_INTERVAL)  # coalesce bursts of updates
+        except OSError:
+            pass
+        finally:
+            with _heartbeat:
+                _open_streams -= 1
+                type(self).last_heartbeat = time.monotonic()
+                _heartbeat.notify_all()
 
     def _shutdown(self) -> None:
-        time.sleep(2)
-        if _download_state.get("active") and not _download_state.get("done") and not _download_state.get("error"):
+        # Give the page a moment, but drop the shutdown as soon as an
+        # install or download is running.
+        if _shutdown_cancel.wait(2.0):
+            return
+        if _install_running():
             return
         if self.server_ref:
             self.server_ref.shutdown()
@@ -1088,11 +1484,25 @@ class _WizardHandler(BaseHTTPRequestHandler):
 
 # -- Installation / download logic -------------------------------------------
 
+# Set while an install/download thread runs; a pending shutdown waits on it.
+_shutdown_cancel = threading.Event()
+
+
+def _guarded_run(target, *args) -> None:
+    """Thread body for install/download work that holds off shutdown."""
+    _shutdown_cancel.set()
+    try:
+        target(*args)
+    finally:
+        _shutdown_cancel.clear()
+
+
 def _run_install(model_idx: int) -> None:
-    _download_state.update(
+    global _installed
+    _set_state(
         active=True, cancelled=False, pct=0, downloaded_mb=0,
         total_mb=0, speed="", eta="", done=False, error="",
-        logs=[], title="Installing binary...", status="Copying to PATH", checks=[],
+        title="Installing binary...", status="Copying to PATH", checks=[],
     )
     try:
         _do_install_binary()
@@ -1101,15 +1511,14 @@ def _run_install(model_idx: int) -> None:
             if (MODEL_DIR / model.filename).exists():
                 _log(f"{model.name} already downloaded", "ok")
             else:
-                _download_state["title"] = f"Downloading {model.name}"
-                _download_state["status"] = f"{model.size_gb:.1f} GB — this may take a few minutes"
+                _set_state(title=f"Downloading {model.name}",
+                           status=f"{model.size_gb:.1f} GB — this may take a few minutes")
                 _download_model(model)
             _save_model_choice(model.filename)
         else:
             _log("Skipped model — using rule-based fallback", "dim")
 
-        _download_state["title"] = "Finishing up..."
-        _download_state["status"] = "Writing configuration"
+        _set_state(title="Finishing up...", status="Writing configuration")
         _do_setup_config()
 
         checks = [
@@ -1119,27 +1528,27 @@ def _run_install(model_idx: int) -> None:
         if model_idx >= 0:
             m = CATALOG[model_idx]
             checks.append({"label": f"AI Model ({m.name})", "ok": (MODEL_DIR / m.filename).exists()})
-        _download_state["checks"] = checks
-        _download_state["done"] = True
+        _installed = None
+        _set_state(checks=checks, done=True)
     except Exception as e:
-        _download_state["error"] = str(e)
+        _set_state(error=str(e))
         _log(f"Error: {e}", "err")
 
 
 def _download_and_switch(idx: int) -> None:
-    _download_state.update(
+    _set_state(
         active=True, pct=0, downloaded_mb=0, total_mb=0,
-        speed="", eta="", done=False, error="", logs=[],
+        speed="", eta="", done=False, error="",
     )
     try:
         model = CATALOG[idx]
         _download_model(model)
         _save_model_choice(model.filename)
-        import termai.config as _cfg
         _cfg._config = None
-        _download_state["done"] = True
+        _invalidate_models_state()
+        _set_state(done=True)
     except Exception as e:
-        _download_state["error"] = str(e)
+        _set_state(error=str(e))
 
 
 def _do_install_binary() -> None:
@@ -1195,6 +1604,25 @@ def _do_install_binary() -> None:
     _log("Created tai symlink", "ok")
 
 
+_DOWNLOAD_CHUNK = 1 << 20
+# Publish progress at most 10 times a second, whatever the link speed
+# (the first chunk always reports, and the loop reports once more at the end).
+_PROGRESS_INTERVAL = 0.1
+
+
+# Built on first download: one TLS context, so retries don't reload the CA store.
+_opener: urllib.request.OpenerDirector | None = None
+
+
+def _url_opener() -> urllib.request.OpenerDirector:
+    global _opener
+    if _opener is None:
+        import ssl
+        context = ssl.create_default_context()
+        _opener = urllib.request.build_opener(urllib.request.HTTPSHandler(context=context))
+    return _opener
+
+
 def _download_model(model) -> None:
     MODEL_DIR.mkdir(parents=True, exist_ok=True)
     url = MODEL_BASE_URL + model.filename
@@ -1213,31 +1641,34 @@ def _download_model(model) -> None:
             req = urllib.request.Request(url, headers={"User-Agent": "termai/0.1"})
             if downloaded > 0:
                 req.add_header("Range", f"bytes={downloaded}-")
-            resp = urllib.request.urlopen(req, timeout=60)
-
-            if downloaded > 0 and resp.status == 200:
-                downloaded = 0
-            total_header = resp.headers.get("Content-Length", "0")
-            total = int(total_header) + downloaded
-
-            chunk_size = 256 * 1024
-            start_time = time.monotonic()
-            with open(tmp, "ab" if downloaded > 0 else "wb") as f:
-                while True:
-                    try:
-                        chunk = resp.read(chunk_size)
-                    except Exception as read_err:
-                        _log(f"Connection interrupted: {read_err}", "dim")
-                        break
-                    if not chunk:
-                        break
-                    f.write(chunk)
-                    downloaded += len(chunk)
-                    _update_progress(downloaded, total, start_time)
+            with _url_opener().open(req, timeout=60) as resp:
+                if downloaded > 0 and resp.status == 200:
+                    downloaded = 0
+                total_header = resp.headers.get("Content-Length", "0")
+                total = int(total_header) + downloaded
+
+                start_time = time.monotonic()
+                last_report = 0.0
+                with open(tmp, "ab" if downloaded > 0 else "wb") as f:
+                    while True:
+                        try:
+                            chunk = resp.read(_DOWNLOAD_CHUNK)
+                        except Exception as read_err:
+                            _log(f"Connection interrupted: {read_err}", "dim")
+                            break
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        downloaded += len(chunk)
+                        now = time.monotonic()
+                        if now - last_report >= _PROGRESS_INTERVAL:
+                            _update_progress(downloaded, total, start_time)
+                            last_report = now
+                _update_progress(downloaded, total, start_time)
 
             if total > 0 and downloaded >= total:
                 tmp.rename(dest)
-                _download_state["pct"] = 100
+                _set_state(pct=100)
                 _log(f"Model saved to {dest}", "ok")
                 return
 
@@ -1274,20 +1705,19 @@ def _update_progress(downloaded: int, total: int, start_time: float) -> None:
         eta = f"~{remaining / 60:.0f} min left" if remaining > 60 else f"~{remaining:.0f}s left"
     else:
         eta = ""
-    _download_state.update(pct=round(pct, 1), downloaded_mb=round(downloaded / 1e6, 1),
-                           total_mb=round(total / 1e6, 1), speed=speed, eta=eta)
+    _set_state(pct=round(pct, 1), downloaded_mb=round(downloaded / 1e6, 1),
+               total_mb=round(total / 1e6, 1), speed=speed, eta=eta)
 
 
 def _save_model_choice(filename: str) -> None:
-    from termai.models import _save_model_choice
-    _save_model_choice(filename)
+    _save_model_choice_impl(filename)
+    _invalidate_models_state()
     _log("Saved model choice to config", "ok")
 
 
 def _do_setup_config() -> None:
     CONFIG_DIR.mkdir(parents=True, exist_ok=True)
     if not CONFIG_FILE.exists():
-        from termai.config import Config
         Config().write_default()
         _log(f"Created config at {CONFIG_FILE}", "ok")
     else:
@@ -1299,6 +1729,9 @@ def _do_setup_config() -> None:
 
 # -- Remote AI helpers ---------------------------------------------------------
 
+_REMOTE_SECTION_RE = re.compile(r"\n?\[remote\][^\[]*")
+
+
 def _mask_key(key: str) -> str:
     """Mask an API key for display, showing only last 4 chars."""
     if not key or len(key) < 8:
@@ -1322,14 +1755,14 @@ def _save_remote_config(data: dict) -> None:
     if claude_key and claude_key.startswith("•"):
         claude_key = cfg.claude_api_key
 
-    if CONFIG_FILE.exists():
-        content = CONFIG_FILE.read_text()
-    else:
-        content = "[termai]\n"
+    try:
+        original = CONFIG_FILE.read_text()
+    except FileNotFoundError:
+        original = None
+    content = "[termai]\n" if original is None else original
 
     # Remove existing [remote] section if present
-    import re as _re
-    content = _re.sub(r"\n?\[remote\][^\[]*", "", content)
+    content = _REMOTE_SECTION_RE.sub("", content)
 
     if provider:
         remote_section = f"\n[remote]\nprovider = \"{provider}\"\nmodel = \"{remote_model}\"\n"
@@ -1339,24 +1772,33 @@ def _save_remote_config(data: dict) -> None:
             remote_section += f'claude_api_key = "{claude_key}"\n'
         content = content.rstrip() + "\n" + remote_section
 
+    # Saving the same settings again leaves the file and the parsed config alone.
+    if content == original:
+        return
     CONFIG_FILE.write_text(content)
 
     # Reset cached config so changes take effect
-    import termai.config as _cfg
     _cfg._config = None
-
-    from termai.remote import reset_remote_provider
     reset_remote_provider()
 
 
+_remote_fingerprint: tuple | None = None
+
+
 def _test_remote_connection() -> tuple[bool, str]:
     """Test the current remote AI configuration."""
+    global _remote_fingerprint
     # Reload config first
-    import termai.config as _cfg
     _cfg._config = None
+    cfg = get_config()
 
-    from termai.remote import reset_remote_provider, get_remote_provider
-    reset_remote_provider()
+    # Keep the provider (and its SDK client's open connection) across repeated
+    # tests; rebuild it only when the remote settings actually changed.
+    fingerprint = (cfg.remote_provider, cfg.remote_model, cfg.openai_api_key,
+                   cfg.claude_api_key, cfg.remote_timeout)
+    if fingerprint != _remote_fingerprint:
+        reset_remote_provider()
+        _remote_fingerprint = fingerprint
     remote = get_remote_provider()
 
     if not remote:
@@ -1370,21 +1812,26 @@ def _test_remote_connection() -> tuple[bool, str]:
 # -- Entry point --------------------------------------------------------------
 
 def _heartbeat_watchdog(server: HTTPServer, handler_cls: type) -> None:
-    missed = 0
-    while True:
-        time.sleep(5)
-        if _download_state.get("active") and not _download_state.get("done") and not _download_state.get("error"):
-            missed = 0
-            continue
-        last = handler_cls.last_heartbeat
-        if last > 0 and (time.monotonic() - last) > 10:
-            missed += 1
-        else:
-            missed = 0
-        if missed >= 6:
-            print("[termai] Browser disconnected — shutting down.")
-            server.shutdown()
-            return
+    """Shut the server down once no page has been connected for a while.
+
+    Blocks on _heartbeat while an /api/events stream is open, so an open
+    page costs no wakeups; the countdown runs only between the last stream
+    closing (or startup) and the next one opening.
+    """
+    with _heartbeat:
+        while True:
+            if _open_streams:
+                _heartbeat.wait()
+                continue
+            if _install_running():
+                # A running install counts as activity; re-check after a grace period.
+                handler_cls.last_heartbeat = time.monotonic()
+            idle = time.monotonic() - handler_cls.last_heartbeat
+            if idle >= _DISCONNECT_GRACE:
+                break
+            _heartbeat.wait(_DISCONNECT_GRACE - idle)
+    print("[termai] Browser disconnected — shutting down.")
+    server.shutdown()
 
 
 def _open_app_window(url: str) -> None:
@@ -1393,8 +1840,6 @@ def _open_app_window(url: str) -> None:
     Tries Chromium-based browsers with --app flag first, then falls back
     to the default browser.
     """
-    import subprocess as _sp
-
     candidates: list[tuple[str, list[str]]] = []
 
     if platform.system() == "Darwin":
@@ -1429,7 +1874,7 @@ def _open_app_window(url: str) -> None:
 
     for name, cmd in candidates:
         try:
-            _sp.Popen(cmd, stdout=_sp.DEVNULL, stderr=_sp.DEVNULL)
+            subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             return
         except (FileNotFoundError, OSError):
             continue
@@ -1443,7 +1888,8 @@ def run_gui_wizard(mode: str = "auto") -> None:
     mode: "auto" (wizard if first run, settings if installed),
           "wizard" (force wizard), "settings" (force settings).
     """
-    page = _build_html(mode=mode)
+    # Encoded once; every GET / writes the same bytes.
+    page = _build_html(mode=mode).encode()
 
     handler = type("Handler", (_WizardHandler,), {
         "html_page": page,
@@ -1452,12 +1898,12 @@ def run_gui_wizard(mode: str = "auto") -> None:
     _PORT = 49152
     for port in range(_PORT, _PORT + 20):
         try:
-            server = HTTPServer(("127.0.0.1", port), handler)
+            server = ThreadingHTTPServer(("127.0.0.1", port), handler)
             break
         except OSError:
             continue
     else:
-        server = HTTPServer(("127.0.0.1", 0), handler)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
         port = server.server_address[1]
     handler.server_ref = server
     url = f"http://127.0.0.1:{port}"
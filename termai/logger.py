@@ -11,6 +11,7 @@ import json
 import os
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Iterable
 
 CYAN = "\033[1;36m"
 GREEN = "\033[1;32m"
@@ -27,35 +28,78 @@ def _ensure_log_dir() -> None:
     LOG_DIR.mkdir(parents=True, exist_ok=True)
 
 
+def _entry(command: str, instruction: str, success: bool | None) -> str:
+    return json.dumps({
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "instruction": instruction,
+        "command": command,
+        "cwd": os.getcwd(),
+        "success": success,
+    }) + "\n"
+
+
 def log_command(
     command: str,
     instruction: str = "",
     success: bool | None = None,
 ) -> None:
     """Append a command entry to the history log (best-effort)."""
+    log_command_many([(command, instruction, success)])
+
+
+def log_command_many(records: Iterable[tuple[str, str, bool | None]]) -> None:
+    """Append several ``(command, instruction, success)`` entries in one write."""
     try:
+        # Inside the try: _entry() calls os.getcwd(), which fails if the
+        # command removed its own working directory.
+        lines = [_entry(*record) for record in records]
+        if not lines:
+            return
         _ensure_log_dir()
-        entry = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "instruction": instruction,
-            "command": command,
-            "cwd": os.getcwd(),
-            "success": success,
-        }
         with open(LOG_FILE, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+            f.write("".join(lines))
     except OSError:
         pass
 
 
 def read_history(limit: int = 20) -> list[dict]:
     """Return the most recent *limit* log entries."""
-    if not LOG_FILE.exists():
+    return tail_jsonl(LOG_FILE, limit)
+
+
+_TAIL_BLOCK = 64 * 1024
+
+
+def tail_jsonl(path: Path, limit: int) -> list[dict]:
+    """Parse the last *limit* entries of a JSON-lines file, oldest first.
+
+    Reads backwards from the end in blocks, so the cost depends on *limit*
+    rather than on how large the file has grown.  ``limit <= 0`` reads all.
+    """
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
         return []
-    with open(LOG_FILE) as f:
-        lines = f.readlines()
-    entries = [json.loads(line) for line in lines if line.strip()]
-    return entries[-limit:]
+    with f:
+        if limit <= 0:
+            lines = [line for line in f if line.strip()]
+        else:
+            # Walk back block by block, collecting complete lines newest-first;
+            # `carry` is the (possibly partial) line at the front of the block.
+            pos = f.seek(0, os.SEEK_END)
+            found: list[bytes] = []
+            carry = b""
+            while pos > 0 and len(found) < limit:
+                step = min(_TAIL_BLOCK, pos)
+                pos -= step
+                f.seek(pos)
+                pieces = (f.read(step) + carry).split(b"\n")
+                carry = pieces[0]
+                found.extend(line for line in reversed(pieces[1:]) if line.strip())
+            if pos == 0 and carry.strip():
+                found.append(carry)
+            lines = found[:limit][::-1]
+    return [json.loads(line) for line in lines]
 
 
 def print_history(limit: int = 20) -> None:
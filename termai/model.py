@@ -10,6 +10,9 @@ Reads defaults from the global Config.
 from __future__ import annotations
 
 import os
+import threading
+from collections.abc import Callable
+from contextlib import ExitStack
 from pathlib import Path
 
 from termai.config import get_config
@@ -32,6 +35,14 @@ class LocalModel:
         self._temperature = cfg.temperature
         self._model = None
         self._available = True
+        # Open chat session reused across chat_generate() calls (see there).
+        self._session: ExitStack | None = None
+        self._session_system: str | None = None
+        self._session_turns: list[str] = []
+        self._cancel = threading.Event()
+        # Whether the last generate() used up max_tokens without reaching a
+        # stop string, i.e. the text may end mid-command.
+        self.hit_token_limit = False
 
     def _load(self) -> None:
         if self._model is not None:
@@ -77,23 +88,62 @@ class LocalModel:
         user_prompt: str,
         *,
         max_tokens: int | None = None,
+        stop: Callable[[str], int] | None = None,
     ) -> str:
-        """Generate a completion given a system prompt and user prompt."""
+        """Generate a completion given a system prompt and user prompt.
+
+        *stop* is called with the text decoded so far and returns the index
+        where the answer ends, or -1 while it is still going; decoding ends
+        early and the text is cut there once it returns an index.  Sets
+        ``hit_token_limit`` when decoding ran out of tokens instead.
+        """
+        self.hit_token_limit = False
         self._load()
-        if self._model is None:
+        if self._model is None or self._cancel.is_set():
             return ""
+        self._close_session()
 
         tokens = max_tokens or self._max_tokens
         with self._model.chat_session(system_prompt=system_prompt):
-            response: str = self._model.generate(
-                user_prompt,
-                max_tokens=tokens,
-                temp=self._temperature,
-                top_k=40,
-                top_p=0.9,
-                repeat_penalty=1.1,
-            )
-        return response.strip()
+            return self._complete(user_prompt, tokens, stop)
+
+    def cancel(self) -> None:
+        """Ask an in-flight generate() to stop at the next token."""
+        self._cancel.set()
+
+    def reset_cancel(self) -> None:
+        """Forget an earlier cancel(); call before starting a new request."""
+        self._cancel.clear()
+
+    def _complete(
+        self, user_prompt: str, tokens: int, stop: Callable[[str], int] | None,
+    ) -> str:
+        pieces: list[str] = []
+        accepted = 0
+
+        def on_token(_token_id: int, piece: str) -> bool:
+            nonlocal accepted
+            if self._cancel.is_set():
+                return False
+            if stop is not None:
+                pieces.append(piece)
+                if stop("".join(pieces)) >= 0:
+                    return False
+            accepted += 1
+            return True
+
+        response: str = self._model.generate(
+            user_prompt,
+            max_tokens=tokens,
+            temp=self._temperature,
+            top_k=40,
+            top_p=0.9,
+            repeat_penalty=1.1,
+            callback=on_token,
+        )
+        self.hit_token_limit = accepted >= tokens
+        cut = stop(response) if stop is not None else -1
+        return (response[:cut] if cut >= 0 else response).strip()
 
     def chat_generate(
         self,
@@ -105,26 +155,52 @@ class LocalModel:
         """Multi-turn chat completion.
 
         *messages* is a list of {"role": "user"|"assistant", "content": "..."} dicts.
+
+        The chat session stays open between calls.  When the system prompt is
+        unchanged and *messages* only adds one user turn to what the session
+        has already seen, just that turn is sent: the backend keeps the system
+        prompt and earlier turns in its context instead of re-processing them.
         """
         self._load()
         if self._model is None:
             return ""
 
         tokens = max_tokens or min(self._max_tokens * 2, 1024)
-        with self._model.chat_session(system_prompt=system_prompt):
-            response = ""
-            for msg in messages:
-                if msg["role"] == "user":
-                    response = self._model.generate(
-                        msg["content"],
-                        max_tokens=tokens,
-                        temp=self._temperature + 0.2,
-                        top_k=40,
-                        top_p=0.9,
-                        repeat_penalty=1.1,
-                    )
+        user_turns = [m["content"] for m in messages if m["role"] == "user"]
+        if (self._session is not None and system_prompt == self._session_system
+                and user_turns[:-1] == self._session_turns):
+            pending = user_turns[-1:]
+        else:
+            self._close_session()
+            self._session = ExitStack()
+            self._session.enter_context(self._model.chat_session(system_prompt=system_prompt))
+            self._session_system = system_prompt
+            pending = user_turns
+
+        response = ""
+        try:
+            for content in pending:
+                response = self._model.generate(
+                    content,
+                    max_tokens=tokens,
+                    temp=self._temperature + 0.2,
+                    top_k=40,
+                    top_p=0.9,
+                    repeat_penalty=1.1,
+                )
+                self._session_turns.append(content)
+        except Exception:
+            self._close_session()
+            raise
         return response.strip()
 
+    def _close_session(self) -> None:
+        if self._session is not None:
+            self._session.close()
+        self._session = None
+        self._session_system = None
+        self._session_turns = []
+
 
 def download_model(model_name: str | None = None) -> None:
     """Download a model. Delegates to the interactive setup in termai.models."""
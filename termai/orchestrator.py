@@ -24,18 +24,22 @@ from typing import TYPE_CHECKING
 from termai.safety import check_command
 from termai.allowlist import should_auto_execute, add_to_session, add_to_permanent
 from termai.logger import log_command
+from termai.classifier import is_multistep  # noqa: F401  (re-exported)
 
 if TYPE_CHECKING:
     from termai.context import SessionContext
 
-CYAN = "\033[1;36m"
-GREEN = "\033[1;32m"
-YELLOW = "\033[0;33m"
-RED = "\033[1;31m"
-BOLD = "\033[1m"
-DIM = "\033[2m"
-MAGENTA = "\033[1;35m"
-RESET = "\033[0m"
+# Colour only when writing to a terminal; pipes and files get plain text.
+_TTY = sys.stdout is not None and sys.stdout.isatty()
+
+CYAN = "\033[1;36m" if _TTY else ""
+GREEN = "\033[1;32m" if _TTY else ""
+YELLOW = "\033[0;33m" if _TTY else ""
+RED = "\033[1;31m" if _TTY else ""
+BOLD = "\033[1m" if _TTY else ""
+DIM = "\033[2m" if _TTY else ""
+MAGENTA = "\033[1;35m" if _TTY else ""
+RESET = "\033[0m" if _TTY else ""
 
 _print_lock = threading.Lock()
 
@@ -84,40 +88,6 @@ class Plan:
         }
 
 
-# -- Multi-step detection -----------------------------------------------------
-
-_MULTISTEP_MARKERS = re.compile(
-    r"\b(?:and\s+then|then\s+\w|first\s+\w|after\s+that|next\s+\w"
-    r"|finally\s+\w|also\s+\w|plus\s+\w|additionally"
-    r"|set\s*up\b|deploy\b|migrate\b|scaffold\b|bootstrap\b"
-    r"|create.*and.*install|install.*and.*configure)\b",
-    re.IGNORECASE,
-)
-
-_MULTI_ACTION_VERBS = frozenset({
-    "create", "make", "set", "setup", "install", "configure", "build",
-    "deploy", "push", "commit", "add", "remove", "delete", "update",
-    "copy", "move", "rename", "download", "upload", "start", "stop",
-    "init", "initialize", "run", "execute", "open", "close",
-})
-
-
-def is_multistep(instruction: str) -> bool:
-    """Heuristic: does this instruction likely need multiple commands?"""
-    if _MULTISTEP_MARKERS.search(instruction):
-        return True
-
-    words = instruction.lower().split()
-    verb_count = sum(1 for w in words if w in _MULTI_ACTION_VERBS)
-    if verb_count >= 2:
-        return True
-
-    if instruction.count(",") >= 2 and len(words) > 8:
-        return True
-
-    return False
-
-
 # -- Plan generation ----------------------------------------------------------
 
 PLAN_SYSTEM_PROMPT = """\
@@ -189,11 +159,13 @@ def generate_plan(instruction: str, ctx: "SessionContext") -> Plan | None:
     return None
 
 
+_JSON_FENCE_RE = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
+
+
 def _parse_plan_json(raw: str) -> list[Step] | None:
     """Try to parse a JSON plan from AI output."""
     text = raw.strip()
-    fence = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
-    m = fence.search(text)
+    m = _JSON_FENCE_RE.search(text)
     if m:
         text = m.group(1).strip()
 
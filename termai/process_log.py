@@ -13,6 +13,8 @@ import json
 from datetime import datetime, timezone
 from pathlib import Path
 
+from termai.logger import tail_jsonl
+
 CYAN = "\033[1;36m"
 GREEN = "\033[1;32m"
 YELLOW = "\033[0;33m"
@@ -41,12 +43,7 @@ def log_process(plan) -> None:
 
 def read_processes(limit: int = 20) -> list[dict]:
     """Return the most recent *limit* process entries (newest last)."""
-    if not PROCESS_LOG.exists():
-        return []
-    with open(PROCESS_LOG) as f:
-        lines = f.readlines()
-    entries = [json.loads(line) for line in lines if line.strip()]
-    return entries[-limit:]
+    return tail_jsonl(PROCESS_LOG, limit)
 
 
 def clear_processes() -> None: